@@ -0,0 +1,191 @@
+"""
+Single-source distances over the degrees graph ("Bacon numbers").
+
+single_source gives the distance and predecessor of every person from
+one source in a single BFS. distance_histogram runs that from many
+sources across a process pool and adds up the distributions.
+write_distances/read_distances store one source's result as raw arrays,
+so a path to anyone can be rebuilt later by following predecessors,
+in O(path length).
+
+    python analytics.py large --source "Kevin Bacon" --output bacon.dist
+    python analytics.py large --sample 100 --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import struct
+import sys
+from array import array
+
+import degrees
+
+# distance of people the source cannot reach
+UNREACHABLE = 0xFFFF
+# predecessor of the source itself and of unreachable people
+NO_PARENT = -1
+
+MAGIC = b"DEGDIST1"
+# magic, source person, number of people
+HEADER = struct.Struct("<8sii")
+
+
+class Distances:
+
+    def __init__(self, source, distance, parent_person, parent_movie):
+        self.source = source
+        # array("H") of degrees from the source, UNREACHABLE if not connected
+        self.distance = distance
+        # array("i") of the person and the movie one step closer to the source
+        self.parent_person = parent_person
+        self.parent_movie = parent_movie
+
+    def path_to(self, person):
+        """
+        (movie, person) index pairs from the source to `person`,
+        or None if `person` cannot be reached.
+        """
+        if self.distance[person] == UNREACHABLE:
+            return None
+        path = []
+        while person != self.source:
+            path.append((self.parent_movie[person], person))
+            person = self.parent_person[person]
+        path.reverse()
+        return path
+
+    def histogram(self):
+        """Maps each distance to how many people are at it."""
+        counts = {}
+        for d in self.distance:
+            if d != UNREACHABLE:
+                counts[d] = counts.get(d, 0) + 1
+        return dict(sorted(counts.items()))
+
+
+def single_source(graph, source):
+    """
+    BFS from the person index `source` to everyone. Each movie's cast is
+    scanned once, the first time one of its stars is expanded.
+    """
+    num_people = graph.num_people()
+    distance = array("H", [UNREACHABLE]) * num_people
+    parent_person = array("i", [NO_PARENT]) * num_people
+    parent_movie = array("i", [NO_PARENT]) * num_people
+    seen_movies = bytearray(graph.num_movies())
+
+    distance[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for costar in graph.people_in(movie):
+                    if distance[costar] == UNREACHABLE:
+                        distance[costar] = depth
+                        parent_person[costar] = person
+                        parent_movie[costar] = movie
+                        next_layer.append(costar)
+        layer = next_layer
+    return Distances(source, distance, parent_person, parent_movie)
+
+
+def write_distances(distances, path):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, distances.source, len(distances.distance)))
+        distances.distance.tofile(f)
+        distances.parent_person.tofile(f)
+        distances.parent_movie.tofile(f)
+
+
+def read_distances(path):
+    with open(path, "rb") as f:
+        magic, source, num_people = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a distances file")
+        distance = array("H")
+        distance.fromfile(f, num_people)
+        parent_person = array("i")
+        parent_person.fromfile(f, num_people)
+        parent_movie = array("i")
+        parent_movie.fromfile(f, num_people)
+    return Distances(source, distance, parent_person, parent_movie)
+
+
+def _histogram_from(source):
+    return single_source(degrees.graph, source).histogram()
+
+
+def distance_histogram(sources, workers=None):
+    """
+    Total distance histogram over BFS runs from every person index in
+    `sources`, spread across `workers` processes. As in
+    degrees.shortest_paths, workers share the loaded graph copy-on-write
+    where fork is available and reload it otherwise.
+    """
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) < 2:
+        histograms = map(_histogram_from, sources)
+        return _merge(histograms)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        context = multiprocessing.get_context()
+        initializer, initargs = degrees.load_data, (degrees.data_directory,)
+    with context.Pool(workers, initializer, initargs) as pool:
+        return _merge(pool.imap_unordered(_histogram_from, sources))
+
+
+def _merge(histograms):
+    total = {}
+    for histogram in histograms:
+        for d, count in histogram.items():
+            total[d] = total.get(d, 0) + count
+    return dict(sorted(total.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="analytics.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--source", help="name of the person to measure from")
+    parser.add_argument("--output", help="write the source's distances here")
+    parser.add_argument("--sample", type=int,
+                        help="histogram over this many random sources")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory)
+    graph = degrees.graph
+
+    if args.source is not None:
+        person_ids = degrees.person_ids_for_name(args.source)
+        if len(person_ids) != 1:
+            sys.exit(f"Expected one person named {args.source!r}, "
+                     f"found {len(person_ids)}.")
+        distances = single_source(graph, graph.person_index[person_ids[0]])
+        if args.output:
+            write_distances(distances, args.output)
+        print(json.dumps(distances.histogram()))
+    elif args.sample is not None:
+        rng = random.Random(args.seed)
+        sources = rng.sample(range(graph.num_people()),
+                             min(args.sample, graph.num_people()))
+        print(json.dumps(distance_histogram(sources, args.workers)))
+    else:
+        sys.exit("Pass --source NAME or --sample N.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Nodes explored per second by the one-sided BFS in degrees.shortest_path,
+before and after moving the frontiers onto deques and hash sets.
+
+The "before" search is a faithful copy of the original loop: a list-backed
+queue frontier that slices on every pop and a list of explored people
+checked with `in`. The "after" search is
+degrees.shortest_path(..., bidirectional=False).
+
+    python benchmark.py large --queries 20 --seed 0
+"""
+
+import argparse
+import random
+import time
+
+import degrees
+from util import Node
+
+
+class ListQueueFrontier:
+    """The queue frontier as it was: a list copied on every remove."""
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, person):
+        return any(node.person == person for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def legacy_shortest_path(source, target, stats):
+    """The original one-sided BFS, over the same graph."""
+    graph = degrees.graph
+    target = graph.person_index[target]
+    frontier = ListQueueFrontier()
+    frontier.add(Node(graph.person_index[source], None, None))
+    explored_persons = []
+    while not frontier.empty():
+        node = frontier.remove()
+        explored_persons.append(node.person)
+        stats["explored"] = len(explored_persons)
+        neighbours = set(graph.neighbors(node.person))
+        success = degrees.is_target_neighbour(neighbours, target)
+        if success:
+            return node.get_path_to_target(success)
+        for movie, person in neighbours:
+            if person in explored_persons:
+                continue
+            frontier.add(Node(person, movie, node))
+    return None
+
+
+def current_shortest_path(source, target, stats):
+    return degrees.shortest_path(source, target, bidirectional=False,
+                                 stats=stats)
+
+
+def run(search, pairs, budget):
+    """
+    Runs `search` over `pairs` and returns (explored, seconds, lengths).
+    Stops early once `budget` seconds have been spent.
+    """
+    explored = 0
+    elapsed = 0.0
+    lengths = []
+    for source, target in pairs:
+        stats = {"explored": 0}
+        start = time.perf_counter()
+        path = search(source, target, stats)
+        elapsed += time.perf_counter() - start
+        explored += stats["explored"]
+        lengths.append(None if path is None else len(path))
+        if elapsed > budget:
+            break
+    return explored, elapsed, lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="seconds to spend on each search at most")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory)
+    rng = random.Random(args.seed)
+    person_ids = degrees.graph.person_ids
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(args.queries)]
+
+    print(f"{'search':<10} {'queries':>8} {'explored':>10} "
+          f"{'seconds':>9} {'nodes/s':>12}")
+    results = {}
+    for name, search in (("before", legacy_shortest_path),
+                         ("after", current_shortest_path)):
+        explored, elapsed, lengths = run(search, pairs, args.budget)
+        results[name] = lengths
+        rate = explored / elapsed if elapsed else float("inf")
+        print(f"{name:<10} {len(lengths):>8} {explored:>10} "
+              f"{elapsed:>9.3f} {rate:>12.0f}")
+
+    # both searches are breadth-first, so they must agree on distances
+    common = min(len(results["before"]), len(results["after"]))
+    for (source, target), before, after in zip(
+            pairs[:common], results["before"], results["after"]):
+        if source != target and before != after:
+            raise SystemExit(
+                f"distance mismatch for {source} -> {target}: "
+                f"{before} != {after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Binary snapshot of a degrees dataset.
+
+The cache is a single file holding the interned Graph: a fixed header,
+the size and mtime of each source CSV it was built from, a table of
+section offsets, then each section back to back. Integer sections are
+raw native int32 arrays so they can be used straight out of an mmap;
+string sections are UTF-8 with a NUL before every entry.
+
+Changes applied to a loaded graph are appended to a journal next to the
+cache (one JSON batch per line) and replayed on load, so keeping the
+on-disk form current costs time proportional to each change. Writing a
+new cache starts a new, empty journal and bumps the generation stored in
+the header, so files derived from the graph (such as landmark distances)
+can tell which cache and how much of its journal they were built from.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import Graph
+from ingest import load
+
+MAGIC = b"DEGCACHE"
+VERSION = 2
+CACHE_NAME = "graph.cache"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# magic, version, byteorder flag, number of sections, generation
+HEADER = struct.Struct("<8sIIIq")
+# size, mtime_ns of one source file
+SOURCE_STAT = struct.Struct("<qq")
+# offset, length in bytes of one section
+SECTION = struct.Struct("<qq")
+
+STRING_SECTIONS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+)
+ARRAY_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_people",
+)
+BYTEORDER = 1 if sys.byteorder == "little" else 2
+
+
+class CacheError(Exception):
+    """Raised when a cache file is missing, corrupt or out of date."""
+
+
+def cache_path(directory):
+    """Default location of the cache for a dataset directory."""
+    return os.path.join(directory, CACHE_NAME)
+
+
+def journal_path(directory, path=None):
+    return f"{path or cache_path(directory)}.delta"
+
+
+def source_stats(directory):
+    """
+    (size, mtime_ns) for each source CSV in `directory`,
+    or None if any of them is missing.
+    """
+    stats = []
+    for name in SOURCES:
+        try:
+            st = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            return None
+        stats.append((st.st_size, st.st_mtime_ns))
+    return stats
+
+
+def cache_generation(path):
+    """Generation of the cache at `path`, or 0 if there is no valid one."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return 0
+    if len(header) != HEADER.size:
+        return 0
+    magic, version, byteorder, _, generation = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or byteorder != BYTEORDER:
+        return 0
+    return generation
+
+
+def write_cache(graph, directory, path=None):
+    """
+    Write `graph` to a cache file for the dataset in `directory`,
+    recording the current size and mtime of its source CSVs and a
+    generation one past that of the cache it replaces.
+
+    Changes applied to the graph are folded into its arrays first (see
+    Graph.compact), so the new journal starts empty.
+    """
+    path = path or cache_path(directory)
+    generation = cache_generation(path) + 1
+    graph.compact()
+    stats = source_stats(directory) or [(0, 0)] * len(SOURCES)
+
+    sections = []
+    for name in STRING_SECTIONS:
+        sections.append("".join(
+            "\0" + s for s in getattr(graph, name)).encode("utf-8"))
+    for name in ARRAY_SECTIONS:
+        sections.append(bytes(memoryview(getattr(graph, name)).cast("B")))
+
+    num_sections = len(sections)
+    offset = (HEADER.size + SOURCE_STAT.size * len(SOURCES)
+              + SECTION.size * num_sections)
+    table = []
+    for data in sections:
+        # keep every section 8-byte aligned so int arrays can be cast in place
+        offset += -offset % 8
+        table.append((offset, len(data)))
+        offset += len(data)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTEORDER, num_sections,
+                            generation))
+        for size, mtime in stats:
+            f.write(SOURCE_STAT.pack(size, mtime))
+        for start, length in table:
+            f.write(SECTION.pack(start, length))
+        for (start, _), data in zip(table, sections):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    try:
+        os.remove(journal_path(directory, path))
+    except FileNotFoundError:
+        pass
+    graph.generation = generation
+    graph.journaled = 0
+    return path
+
+
+def load_cache(directory, path=None, check_sources=True):
+    """
+    Memory-map a cache file and return the Graph it holds.
+
+    Raises CacheError if the file is missing, was written by a different
+    version or machine, or (when `check_sources` is set) if the source
+    CSVs in `directory` have changed size or mtime since it was built.
+    """
+    path = path or cache_path(directory)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        raise CacheError(f"no cache at {path}")
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CacheError(f"empty cache at {path}")
+
+    view = memoryview(mm)
+    try:
+        (magic, version, byteorder, num_sections,
+         generation) = HEADER.unpack_from(view, 0)
+    except struct.error:
+        raise CacheError(f"truncated cache at {path}")
+    if magic != MAGIC:
+        raise CacheError(f"{path} is not a degrees cache")
+    if version != VERSION or byteorder != BYTEORDER:
+        raise CacheError(f"{path} was written by an incompatible version")
+    if num_sections != len(STRING_SECTIONS) + len(ARRAY_SECTIONS):
+        raise CacheError(f"{path} has an unexpected layout")
+
+    offset = HEADER.size
+    stats = []
+    for _ in SOURCES:
+        stats.append(SOURCE_STAT.unpack_from(view, offset))
+        offset += SOURCE_STAT.size
+    if check_sources:
+        current = source_stats(directory)
+        if current is not None and [tuple(s) for s in current] != stats:
+            raise CacheError(f"{path} is stale")
+
+    table = []
+    for _ in range(num_sections):
+        table.append(SECTION.unpack_from(view, offset))
+        offset += SECTION.size
+
+    fields = {}
+    for name, (start, length) in zip(STRING_SECTIONS, table):
+        data = bytes(view[start:start + length]).decode("utf-8")
+        fields[name] = data.split("\0")[1:]
+    for name, (start, length) in zip(ARRAY_SECTIONS,
+                                      table[len(STRING_SECTIONS):]):
+        fields[name] = view[start:start + length].cast("i")
+
+    graph = Graph(**fields)
+    # the int sections borrow from the mapping, so keep it alive with them
+    graph.mmap = mm
+    graph.generation = generation
+
+    try:
+        with open(journal_path(directory, path), "rb") as f:
+            for line in f:
+                graph.apply_changes(**json.loads(line))
+            graph.journaled = f.tell()
+    except FileNotFoundError:
+        pass
+    return graph
+
+
+def append_changes(directory, changes, path=None):
+    """
+    Records a batch of Graph.apply_changes keyword arguments in the
+    journal of the cache for `directory`. Returns False, writing nothing,
+    if there is no cache to keep in step.
+    """
+    path = path or cache_path(directory)
+    if not os.path.exists(path):
+        return False
+    batch = {name: [list(item) if isinstance(item, (list, tuple)) else item
+                    for item in items]
+             for name, items in changes.items()}
+    with open(journal_path(directory, path), "a", encoding="utf-8") as f:
+        f.write(json.dumps(batch) + "\n")
+    return True
+
+
+def load_graph(directory, use_cache=True):
+    """
+    Load the dataset in `directory`, from its cache if there is a fresh
+    one and from the CSVs (with the fastest available loader) otherwise.
+    """
+    if use_cache:
+        try:
+            return load_cache(directory)
+        except CacheError:
+            pass
+    return load(directory)
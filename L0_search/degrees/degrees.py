@@ -1,69 +1,122 @@
-import csv
+import argparse
+import multiprocessing
+import os
 import sys
 
-from util import Node, StackFrontier, QueueFrontier, GBFS
+# the search instrumentation lives one level up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from cache import append_changes, load_graph, write_cache
+from graph import PeopleView, MoviesView
+from instrument import Probe
+from name_index import NameIndex
+from paths import recency, shortest_path_dag
+from util import Node, StackFrontier, QueueFrontier, VisitedMap
+
+# Interned actor-movie graph everything below is answered from
+graph = None
+
+# Directory the graph was loaded from, so worker processes can reload it
+data_directory = None
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
+# Prefix and fuzzy name lookup over the same people
+name_index = None
+
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+people = PeopleView()
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+movies = MoviesView()
 
 
 # TODO
 # try greedy best first by choosing actor with most neighbours
 
 
-def load_data(directory):
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set(),
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set(),
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+def load_data(directory, use_cache=True):
+    """
+    Load data into memory, from the binary cache in `directory` if it is
+    up to date with the CSV files and from the CSV files otherwise.
+    """
+    global data_directory
+    set_graph(load_graph(directory, use_cache=use_cache))
+    data_directory = directory
+
+
+def set_graph(new_graph):
+    """
+    Make `new_graph` the graph searched by this module and point the
+    `names`, `people` and `movies` views at it.
+    """
+    global graph, name_index
+    graph = new_graph
+    names.clear()
+    names.update(graph.name_index())
+    name_index = NameIndex.from_graph(graph)
+    people.graph = graph
+    movies.graph = graph
+
+
+def apply_changes(**changes):
+    """
+    Applies a batch of additions and removals to the loaded graph (see
+    Graph.apply_changes for the keyword arguments), patches `names` and
+    the name index for the people it renamed, added or removed, and
+    journals the batch next to the binary cache if there is one.
+    """
+    result = graph.apply_changes(**changes)
+    for person, old_name, new_name in result["renamed"]:
+        person_id = graph.person_ids[person]
+        if old_name is not None:
+            ids = names.get(old_name.lower())
+            if ids is not None:
+                ids.discard(person_id)
+                if not ids:
+                    del names[old_name.lower()]
+            name_index.remove(person, old_name)
+        if new_name is not None:
+            names.setdefault(new_name.lower(), set()).add(person_id)
+            name_index.add(person, new_name)
+    if data_directory is not None:
+        append_changes(data_directory, changes)
+    return result
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="degrees.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument(
+        "--build-cache", action="store_true",
+        help="parse the CSV files and write a binary cache next to them",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="always parse the CSV files, even if a fresh cache exists",
+    )
+    parser.add_argument(
+        "--all", type=int, metavar="LIMIT",
+        help="list up to LIMIT shortest paths, most recent movies first",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = parse_args(sys.argv[1:])
+    directory = args.directory
+
+    if args.build_cache:
+        print("Building cache...")
+        path = write_cache(load_graph(directory, use_cache=False), directory)
+        print(f"Cache written to {path}.")
+        return
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, use_cache=not args.no_cache)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -73,7 +126,19 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.all is not None:
+        paths = list(recent_shortest_paths(source, target, args.all))
+        if not paths:
+            print("Not connected.")
+        for n, path in enumerate(paths, 1):
+            chain = [people[source]["name"]]
+            for movie_id, person_id in path:
+                chain.append(f"[{movies[movie_id]['title']}] "
+                             f"{people[person_id]['name']}")
+            print(f"{n}: {' -> '.join(chain)}")
+        return
+
+    path = shortest_path(source, target, probe=Probe(report_every=500))
 
     if path is None:
         print("Not connected.")
@@ -88,46 +153,223 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True, stats=None,
+                  probe=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    By default the search grows from both ends at once (see
+    `bidirectional_search`); pass bidirectional=False for the
+    original one-sided breadth-first search. If `stats` is a dict,
+    the number of people expanded is stored in stats["explored"].
+    If `probe` is an instrument.Probe, every expansion is reported to it.
+
     If no possible path, returns None.
     """
+    if bidirectional:
+        return bidirectional_search(source, target, stats=stats, probe=probe)
 
-    source_node = Node(person=source, movie=None, parent=None)
+    if source == target:
+        if stats is not None:
+            stats["explored"] = 0
+        return []
+    source_index = graph.person_index[source]
+    target_index = graph.person_index[target]
 
     frontier = QueueFrontier()
-    frontier.add(source_node)
-    success_path = None
-    explored_persons = []
+    frontier.add(Node(person=source_index, movie=None, parent=None))
+    visited = VisitedMap(source_index)
+    num_explored = 0
     while not frontier.empty():
 
         node = frontier.remove()
-        explored_persons.append(node.person)
-        len_ex = len(explored_persons)
-        if len_ex % 500 == 0:
-            print(f"num explored = {len_ex}")
-
-        # let's check if a neighbour is the target
-        neighbours = neighbors_for_person(node.person)
-        success_neighbour = is_target_neighbour(neighbours, target)
-        if success_neighbour:
-            success_path = node.get_path_to_target(success_neighbour)
-            return success_path
+        num_explored += 1
+        if probe is not None:
+            probe.expand(len(frontier))
+
+        for movie, person in graph.neighbors(node.person):
+            # people are marked visited as they are enqueued
+            if not visited.add(person, movie, node.person):
+                continue
+            if person == target_index:
+                if stats is not None:
+                    stats["explored"] = num_explored
+                return path_to_ids(visited.path_to(person))
+            frontier.add(Node(person, movie, node))
+
+    if stats is not None:
+        stats["explored"] = num_explored
+    return None
+
+
+def shortest_paths(pairs, workers=None):
+    """
+    Returns shortest_path(source, target) for every (source, target)
+    pair, in input order, fanning the queries out across `workers`
+    processes (default: one per CPU).
+
+    Where fork is available the workers share the already-loaded graph
+    copy-on-write. Elsewhere each worker reloads it once, which memory-maps
+    the binary cache if one has been built, so the graph is never pickled
+    per task.
+    """
+    pairs = list(pairs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pairs) < 2:
+        return [shortest_path(source, target) for source, target in pairs]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        context = multiprocessing.get_context()
+        initializer, initargs = load_data, (data_directory,)
+
+    chunksize = max(1, len(pairs) // (workers * 8))
+    with context.Pool(workers, initializer, initargs) as pool:
+        return pool.map(_shortest_path_for_pair, pairs, chunksize)
+
+
+def _shortest_path_for_pair(pair):
+    return shortest_path(*pair)
+
+
+def bidirectional_search(source, target, stats=None, probe=None):
+    """
+    Breadth-first search from both the source and the target.
+
+    Each round expands one whole layer of whichever side has the smaller
+    frontier. When a layer reaches a person already seen by the other side,
+    the cheapest meeting point in that layer is used to splice the two
+    halves into a single list of (movie_id, person_id) pairs.
+
+    If no possible path, returns None. If `stats` is a dict, the number
+    of people expanded on both sides is stored in stats["explored"], and
+    if `probe` is given every expansion is reported to it.
+    """
+    explored = 0
+    if stats is not None:
+        stats["explored"] = explored
+    if source == target:
+        return []
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+
+    # person -> (movie, person one step closer to the source)
+    forward_parents = {source: (None, None)}
+    # person -> (movie, person one step closer to the target)
+    backward_parents = {target: (None, None)}
+    # depth of every visited person, per side
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # always expand the smaller side
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, depth = (
+                forward_frontier, forward_parents, forward_depth)
+            other_depth = backward_depth
         else:
-            for neighbour in neighbours:
-                person = neighbour[1]
-                if person in explored_persons:
+            frontier, parents, depth = (
+                backward_frontier, backward_parents, backward_depth)
+            other_depth = forward_depth
+
+        meeting = None
+        best = None
+        next_frontier = []
+        explored += len(frontier)
+        if stats is not None:
+            stats["explored"] = explored
+        for person in frontier:
+            if probe is not None:
+                probe.expand(len(forward_frontier) + len(backward_frontier)
+                             + len(next_frontier))
+            for movie, neighbour in graph.neighbors(person):
+                if neighbour in depth:
                     continue
-                movie = neighbour[0]
-                new_node = Node(person, movie, node)
-                frontier.add(new_node)
+                depth[neighbour] = depth[person] + 1
+                parents[neighbour] = (movie, person)
+                next_frontier.append(neighbour)
+                if neighbour in other_depth:
+                    total = depth[neighbour] + other_depth[neighbour]
+                    if best is None or total < best:
+                        best = total
+                        meeting = neighbour
+
+        if meeting is not None:
+            return path_to_ids(
+                splice_path(meeting, forward_parents, backward_parents))
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
 
     return None
 
 
+def all_shortest_paths(source, target, limit=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, lazily, stopping after `limit`
+    of them if it is given. Yields nothing if they are not connected.
+    """
+    dag = shortest_path_dag(graph, graph.person_index[source],
+                            graph.person_index[target])
+    if dag is None:
+        return
+    for path in dag.paths(limit):
+        yield path_to_ids(path)
+
+
+def recent_shortest_paths(source, target, k=10):
+    """
+    Yields the `k` shortest lists of (movie_id, person_id) pairs whose
+    movies are the most recent on the whole, most recent first.
+    """
+    dag = shortest_path_dag(graph, graph.person_index[source],
+                            graph.person_index[target])
+    if dag is None:
+        return
+    for path in dag.best_paths(recency(graph), k):
+        yield path_to_ids(path)
+
+
+def splice_path(meeting, forward_parents, backward_parents):
+    """
+    Joins the source half and target half of a bidirectional search
+    at the meeting person into a list of (movie, person) index pairs.
+    """
+    path = []
+    person = meeting
+    while forward_parents[person][1] is not None:
+        movie, parent = forward_parents[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward_parents[person][1] is not None:
+        movie, child = backward_parents[person]
+        path.append((movie, child))
+        person = child
+    return path
+
+
+def path_to_ids(path):
+    """
+    Converts a list of (movie, person) index pairs into
+    (movie_id, person_id) pairs.
+    """
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
 def is_target_neighbour(neighbours, target):
     """returns a tuple (movie, person) from the neighbours
     list if one of the neighbours has the target.
@@ -140,6 +382,22 @@ def is_target_neighbour(neighbours, target):
         return None
 
 
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id matching a person's name, without prompting.
+    """
+    return sorted(names.get(name.lower(), set()))
+
+
+def person_candidates(name, limit=10):
+    """
+    Returns up to `limit` IMDB ids for a possibly partial or misspelled
+    name, best match first, without prompting.
+    """
+    return [graph.person_ids[person]
+            for person in name_index.candidates(name, limit)]
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -147,6 +405,20 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        person_ids = person_candidates(name, limit=5)
+        if not person_ids:
+            return None
+        print(f"No exact match for '{name}'. Did you mean:")
+        for person_id in person_ids:
+            person = people[person_id]
+            print(f"ID: {person_id}, Name: {person['name']}, "
+                  f"Birth: {person['birth']}")
+        try:
+            person_id = input("Intended Person ID: ")
+            if person_id in person_ids:
+                return person_id
+        except ValueError:
+            pass
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
@@ -171,18 +443,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-
-    [
-        [
-            neighbors.add((movie_id, person_id))
-            for person_id in movies[movie_id]["stars"]
-        ]
-        for movie_id in movie_ids
-    ]
-
-    return neighbors
+    person = graph.person_index[person_id]
+    return {(graph.movie_ids[movie], graph.person_ids[neighbour])
+            for movie, neighbour in graph.neighbors(person)}
 
 
 if __name__ == "__main__":
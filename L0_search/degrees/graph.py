@@ -0,0 +1,441 @@
+import csv
+from array import array
+from collections.abc import Mapping
+
+
+def last_rows(ids, *columns):
+    """
+    Drops every row whose id appears again further down, so the last row
+    for an id wins, as it did when the CSVs were loaded into dicts.
+    Returns `ids` and each of `columns` as lists, filtered alike.
+    """
+    last = {row_id: i for i, row_id in enumerate(ids)}
+    if len(last) == len(ids):
+        return (ids, *columns)
+    keep = [i for i, row_id in enumerate(ids) if last[row_id] == i]
+    return tuple([column[i] for i in keep] for column in (ids, *columns))
+
+
+class Graph:
+    """
+    Compact actor-movie graph.
+
+    People and movies are interned to dense ints (their position in
+    `person_ids` / `movie_ids`). Adjacency is stored in CSR form: the
+    movies of person p are `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    and the people of movie m are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+
+    Changes made after loading (see `apply_changes`) live in a small
+    overlay on top of the CSR arrays rather than rebuilding them;
+    `compact` folds the overlay back in.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        self.person_index = {pid: i for i, pid in enumerate(person_ids)}
+        self.movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.clear_overlay()
+        # generation of the binary cache this graph was loaded from and
+        # the bytes of its journal replayed (see cache.py); 0 for the CSVs
+        self.generation = 0
+        self.journaled = 0
+
+    def clear_overlay(self):
+        # people and movies covered by the CSR arrays
+        self.base_people = len(self.person_offsets) - 1
+        self.base_movies = len(self.movie_offsets) - 1
+        # star edges added since loading, in both directions
+        self.added_movies = {}
+        self.added_people = {}
+        # CSR star edges removed since loading, as (person, movie)
+        self.removed_edges = set()
+        self.removed_people = set()
+        self.removed_movies = set()
+        self.overlay = False
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Load people.csv, movies.csv and stars.csv from `directory`.
+        """
+        person_ids, person_names, person_births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+        person_ids, person_names, person_births = last_rows(
+            person_ids, person_names, person_births)
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+        movie_ids, movie_titles, movie_years = last_rows(
+            movie_ids, movie_titles, movie_years)
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        edge_people, edge_movies = array("i"), array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = person_index.get(row["person_id"])
+                movie = movie_index.get(row["movie_id"])
+                # stars rows pointing at unknown people or movies are skipped
+                if person is None or movie is None:
+                    continue
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        return cls.from_edges(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            edge_people, edge_movies,
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   edge_people, edge_movies):
+        """
+        Build the graph from parallel arrays of (person, movie) star edges,
+        given as dense indices. Duplicate edges are dropped.
+        """
+        num_people = len(person_ids)
+        num_movies = len(movie_ids)
+
+        # counting sort the edges by person
+        counts = array("i", bytes(4 * (num_people + 1)))
+        for person in edge_people:
+            counts[person + 1] += 1
+        for p in range(num_people):
+            counts[p + 1] += counts[p]
+        slots = array("i", counts)
+        person_movies = array("i", bytes(4 * len(edge_people)))
+        for person, movie in zip(edge_people, edge_movies):
+            person_movies[slots[person]] = movie
+            slots[person] += 1
+
+        # sort each person's movies and drop duplicate edges
+        person_offsets = array("i", bytes(4 * (num_people + 1)))
+        movie_counts = array("i", bytes(4 * (num_movies + 1)))
+        size = 0
+        for person in range(num_people):
+            previous = -1
+            edges = person_movies[counts[person]:counts[person + 1]]
+            for movie in sorted(edges):
+                if movie != previous:
+                    person_movies[size] = movie
+                    size += 1
+                    movie_counts[movie + 1] += 1
+                    previous = movie
+            person_offsets[person + 1] = size
+        del person_movies[size:]
+        for m in range(num_movies):
+            movie_counts[m + 1] += movie_counts[m]
+
+        # counting sort the same edges by movie
+        movie_offsets = array("i", movie_counts)
+        movie_people = array("i", bytes(4 * size))
+        for person in range(num_people):
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                movie_people[movie_counts[movie]] = person
+                movie_counts[movie] += 1
+
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies, movie_offsets, movie_people,
+        )
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """Movie indices `person` starred in."""
+        if not self.overlay:
+            return self.person_movies[
+                self.person_offsets[person]:self.person_offsets[person + 1]]
+        if person in self.removed_people:
+            return []
+        movies = []
+        if person < self.base_people:
+            for movie in self.person_movies[
+                    self.person_offsets[person]:self.person_offsets[person + 1]]:
+                if (movie not in self.removed_movies
+                        and (person, movie) not in self.removed_edges):
+                    movies.append(movie)
+        movies.extend(self.added_movies.get(person, ()))
+        return movies
+
+    def people_in(self, movie):
+        """Person indices who starred in `movie`."""
+        if not self.overlay:
+            return self.movie_people[
+                self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+        if movie in self.removed_movies:
+            return []
+        people = []
+        if movie < self.base_movies:
+            for person in self.movie_people[
+                    self.movie_offsets[movie]:self.movie_offsets[movie + 1]]:
+                if (person not in self.removed_people
+                        and (person, movie) not in self.removed_edges):
+                    people.append(person)
+        people.extend(self.added_people.get(movie, ()))
+        return people
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for everyone who starred with
+        `person`, straight out of the CSR arrays. The same co-star can be
+        yielded once per shared movie, and `person` yields itself.
+        """
+        if self.overlay:
+            for movie in self.movies_of(person):
+                for costar in self.people_in(movie):
+                    yield movie, costar
+            return
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def degree(self, person):
+        """Number of (movie, co-star) pairs reachable from `person`."""
+        total = 0
+        if self.overlay:
+            for movie in self.movies_of(person):
+                total += len(self.people_in(movie))
+            return total
+        for movie in self.movies_of(person):
+            total += self.movie_offsets[movie + 1] - self.movie_offsets[movie]
+        return total
+
+    def has_star(self, person, movie):
+        """Whether `person` starred in `movie`."""
+        return movie in self.movies_of(person)
+
+    def apply_changes(self, add_people=(), add_movies=(), add_stars=(),
+                      remove_stars=(), remove_movies=(), remove_people=()):
+        """
+        Applies a batch of changes in time proportional to its size.
+
+        add_people holds (id, name, birth) rows, add_movies holds
+        (id, title, year) rows, and add_stars/remove_stars hold
+        (person_id, movie_id) pairs; remove_people and remove_movies are
+        ids. Adding an id that already exists updates its name or title.
+        Removing a person or movie also removes its star edges. Stars that
+        refer to unknown ids are skipped, like rows in stars.csv.
+
+        Returns a dict of the person indices whose names changed
+        ("renamed", as (person, old name or None, new name or None)) and
+        the person indices whose star edges changed ("touched").
+        """
+        renamed = []
+        touched = set()
+        self.overlay = True
+
+        for person_id, name, birth in add_people:
+            person = self.person_index.get(person_id)
+            if person is None:
+                person = len(self.person_ids)
+                self.person_ids.append(person_id)
+                self.person_names.append(name)
+                self.person_births.append(birth)
+                self.person_index[person_id] = person
+                renamed.append((person, None, name))
+            else:
+                renamed.append((person, self.person_names[person], name))
+                self.person_names[person] = name
+                self.person_births[person] = birth
+
+        for movie_id, title, year in add_movies:
+            movie = self.movie_index.get(movie_id)
+            if movie is None:
+                movie = len(self.movie_ids)
+                self.movie_ids.append(movie_id)
+                self.movie_titles.append(title)
+                self.movie_years.append(year)
+                self.movie_index[movie_id] = movie
+            else:
+                self.movie_titles[movie] = title
+                self.movie_years[movie] = year
+
+        for person_id, movie_id in add_stars:
+            person = self.person_index.get(person_id)
+            movie = self.movie_index.get(movie_id)
+            if person is None or movie is None:
+                continue
+            if self.has_star(person, movie):
+                continue
+            if (person, movie) in self.removed_edges:
+                self.removed_edges.discard((person, movie))
+            else:
+                self.added_movies.setdefault(person, []).append(movie)
+                self.added_people.setdefault(movie, []).append(person)
+            touched.add(person)
+
+        for person_id, movie_id in remove_stars:
+            person = self.person_index.get(person_id)
+            movie = self.movie_index.get(movie_id)
+            if person is None or movie is None:
+                continue
+            self._remove_star(person, movie)
+            touched.add(person)
+
+        for movie_id in remove_movies:
+            movie = self.movie_index.pop(movie_id, None)
+            if movie is None:
+                continue
+            touched.update(self.people_in(movie))
+            for person in list(self.added_people.pop(movie, ())):
+                self.added_movies[person].remove(movie)
+            self.removed_movies.add(movie)
+
+        for person_id in remove_people:
+            person = self.person_index.pop(person_id, None)
+            if person is None:
+                continue
+            touched.add(person)
+            for movie in list(self.added_movies.pop(person, ())):
+                self.added_people[movie].remove(person)
+            self.removed_people.add(person)
+            renamed.append((person, self.person_names[person], None))
+
+        return {"renamed": renamed, "touched": touched}
+
+    def _remove_star(self, person, movie):
+        added = self.added_movies.get(person)
+        if added is not None and movie in added:
+            added.remove(movie)
+            self.added_people[movie].remove(person)
+        elif self.has_star(person, movie):
+            self.removed_edges.add((person, movie))
+
+    def compact(self):
+        """
+        Rebuilds the CSR arrays with every applied change folded in.
+        Removed people and movies are dropped, so the indices of those
+        after them shift down.
+        """
+        if not self.overlay:
+            return
+        people = [p for p in range(len(self.person_ids))
+                  if p not in self.removed_people]
+        movies = [m for m in range(len(self.movie_ids))
+                  if m not in self.removed_movies]
+        new_movie = array("i", [-1]) * len(self.movie_ids)
+        for i, movie in enumerate(movies):
+            new_movie[movie] = i
+        edge_people, edge_movies = array("i"), array("i")
+        for i, person in enumerate(people):
+            for movie in self.movies_of(person):
+                edge_people.append(i)
+                edge_movies.append(new_movie[movie])
+        compacted = Graph.from_edges(
+            [self.person_ids[p] for p in people],
+            [self.person_names[p] for p in people],
+            [self.person_births[p] for p in people],
+            [self.movie_ids[m] for m in movies],
+            [self.movie_titles[m] for m in movies],
+            [self.movie_years[m] for m in movies],
+            edge_people, edge_movies,
+        )
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years",
+                     "person_offsets", "person_movies",
+                     "movie_offsets", "movie_people",
+                     "person_index", "movie_index"):
+            setattr(self, name, getattr(compacted, name))
+        self.clear_overlay()
+
+    def name_index(self):
+        """Maps lower-cased names to a set of corresponding person_ids."""
+        names = {}
+        for person_id, person in self.person_index.items():
+            name = self.person_names[person]
+            names.setdefault(name.lower(), set()).add(person_id)
+        return names
+
+
+class PeopleView(Mapping):
+    """
+    Read-only dict view over a Graph's people, keyed by IMDb id:
+    person_id -> {"name", "birth", "movies" (a set of movie_ids)}.
+    """
+
+    def __init__(self, graph=None):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        if graph is None:
+            raise KeyError(person_id)
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[m] for m in graph.movies_of(person)},
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_index if self.graph is not None else ())
+
+    def __len__(self):
+        return len(self.graph.person_index) if self.graph is not None else 0
+
+    def __contains__(self, person_id):
+        return self.graph is not None and person_id in self.graph.person_index
+
+
+class MoviesView(Mapping):
+    """
+    Read-only dict view over a Graph's movies, keyed by IMDb id:
+    movie_id -> {"title", "year", "stars" (a set of person_ids)}.
+    """
+
+    def __init__(self, graph=None):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        if graph is None:
+            raise KeyError(movie_id)
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[p] for p in graph.people_in(movie)},
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_index if self.graph is not None else ())
+
+    def __len__(self):
+        return len(self.graph.movie_index) if self.graph is not None else 0
+
+    def __contains__(self, movie_id):
+        return self.graph is not None and movie_id in self.graph.movie_index
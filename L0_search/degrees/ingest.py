@@ -0,0 +1,194 @@
+"""
+Bulk loading of the degrees CSV files.
+
+load_vectorized reads each file in one go with pandas (the pyarrow parser
+when it is installed), keeps only the columns the graph needs, and builds
+both CSR adjacencies with NumPy sorts and bincounts instead of a Python
+loop per row. load_streaming needs nothing beyond the standard library:
+it reads the files a chunk of rows at a time and only ever holds the
+compact edge arrays plus one chunk of rows.
+
+    python ingest.py large
+"""
+
+import argparse
+import csv
+import time
+from array import array
+from itertools import islice
+from operator import itemgetter
+
+from graph import Graph, last_rows
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+CHUNK_ROWS = 100_000
+
+
+def load(directory):
+    """Loads `directory` with the fastest loader available."""
+    if pd is not None:
+        return load_vectorized(directory)
+    return load_streaming(directory)
+
+
+def _read(path, columns):
+    return pd.read_csv(path, usecols=columns, dtype=str,
+                       keep_default_na=False, engine=CSV_ENGINE)
+
+
+def _int_array(values):
+    return array("i", np.ascontiguousarray(values, dtype=np.int32).tobytes())
+
+
+def _csr(rows, cols, num_rows):
+    """
+    Offsets and column indices of the (row, col) pairs grouped by row.
+    The pairs must already be sorted by col within each row.
+    """
+    order = np.argsort(rows, kind="stable")
+    offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    # minlength gives rows with no pairs (a movie nobody starred in) an
+    # empty range, wherever they fall
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=offsets[1:])
+    return _int_array(offsets), _int_array(cols[order])
+
+
+def load_vectorized(directory):
+    """Loads `directory` with pandas and NumPy."""
+    if pd is None:
+        raise RuntimeError("load_vectorized needs pandas and numpy")
+
+    people = _read(f"{directory}/people.csv", ["id", "name", "birth"])
+    movies = _read(f"{directory}/movies.csv", ["id", "title", "year"])
+    stars = _read(f"{directory}/stars.csv", ["person_id", "movie_id"])
+    # a repeated id keeps only its last row
+    people = people[~people["id"].duplicated(keep="last")]
+    movies = movies[~movies["id"].duplicated(keep="last")]
+
+    person_index = pd.Index(people["id"])
+    movie_index = pd.Index(movies["id"])
+    edge_people = person_index.get_indexer(stars["person_id"])
+    edge_movies = movie_index.get_indexer(stars["movie_id"])
+
+    # stars rows pointing at unknown people or movies are skipped,
+    # duplicates are dropped by packing each edge into one sortable key
+    known = (edge_people >= 0) & (edge_movies >= 0)
+    keys = np.unique(edge_people[known].astype(np.int64) * len(movies)
+                     + edge_movies[known])
+    # the keys come back sorted, i.e. by person and then by movie
+    edge_people, edge_movies = np.divmod(keys, len(movies))
+
+    person_offsets, person_movies = _csr(edge_people, edge_movies, len(people))
+    movie_offsets, movie_people = _csr(edge_movies, edge_people, len(movies))
+
+    return Graph(
+        people["id"].tolist(), people["name"].tolist(),
+        people["birth"].tolist(),
+        movies["id"].tolist(), movies["title"].tolist(),
+        movies["year"].tolist(),
+        person_offsets, person_movies, movie_offsets, movie_people,
+    )
+
+
+def _chunks(path, columns, chunk_rows):
+    """Yields lists of rows holding only `columns`, `chunk_rows` at a time."""
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        project = itemgetter(*(header.index(column) for column in columns))
+        while True:
+            chunk = list(map(project, islice(reader, chunk_rows)))
+            if not chunk:
+                return
+            yield chunk
+
+
+def load_streaming(directory, chunk_rows=CHUNK_ROWS):
+    """Loads `directory` with the csv module, a chunk of rows at a time."""
+    person_ids, person_names, person_births = [], [], []
+    for chunk in _chunks(f"{directory}/people.csv",
+                         ("id", "name", "birth"), chunk_rows):
+        for person_id, name, birth in chunk:
+            person_ids.append(person_id)
+            person_names.append(name)
+            person_births.append(birth)
+    person_ids, person_names, person_births = last_rows(
+        person_ids, person_names, person_births)
+
+    movie_ids, movie_titles, movie_years = [], [], []
+    for chunk in _chunks(f"{directory}/movies.csv",
+                         ("id", "title", "year"), chunk_rows):
+        for movie_id, title, year in chunk:
+            movie_ids.append(movie_id)
+            movie_titles.append(title)
+            movie_years.append(year)
+    movie_ids, movie_titles, movie_years = last_rows(
+        movie_ids, movie_titles, movie_years)
+
+    person_index = {pid: i for i, pid in enumerate(person_ids)}
+    movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+    edge_people, edge_movies = array("i"), array("i")
+    for chunk in _chunks(f"{directory}/stars.csv",
+                         ("person_id", "movie_id"), chunk_rows):
+        people = [person_index.get(person_id) for person_id, _ in chunk]
+        movies = [movie_index.get(movie_id) for _, movie_id in chunk]
+        # stars rows pointing at unknown people or movies are skipped
+        if None in people or None in movies:
+            known = [p is not None and m is not None
+                     for p, m in zip(people, movies)]
+            people = [p for p, ok in zip(people, known) if ok]
+            movies = [m for m, ok in zip(movies, known) if ok]
+        edge_people.extend(people)
+        edge_movies.extend(movies)
+
+    return Graph.from_edges(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        edge_people, edge_movies,
+    )
+
+
+def same_graph(a, b):
+    fields = (
+        "person_ids", "person_names", "person_births",
+        "movie_ids", "movie_titles", "movie_years",
+        "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    )
+    return all(list(getattr(a, f)) == list(getattr(b, f)) for f in fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="ingest.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+
+    loaders = [("dictreader", Graph.from_csv), ("streaming", load_streaming)]
+    if pd is not None:
+        loaders.append((f"vectorized ({CSV_ENGINE})", load_vectorized))
+
+    reference = None
+    for name, loader in loaders:
+        start = time.perf_counter()
+        graph = loader(args.directory)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {elapsed:>8.3f} s")
+        if reference is None:
+            reference = graph
+        elif not same_graph(reference, graph):
+            raise SystemExit(f"{name} built a different graph")
+
+
+if __name__ == "__main__":
+    main()
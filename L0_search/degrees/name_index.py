@@ -0,0 +1,231 @@
+"""
+Prefix and fuzzy lookup of people by name.
+
+Names are lower-cased into a sorted array of distinct keys, so a prefix is
+a bisect away. For misspellings, every key is also posted under its
+character trigrams. A name within k edits of the query shares at least
+(number of query trigrams - 3k) of them, so candidates only need to be
+gathered from the rarest few posting lists; their shared trigrams are then
+counted and only the names with enough of them are checked with a bounded
+edit distance. Queries too short for that bound to rule anything out are
+checked against every name of a similar length instead.
+
+People added or renamed after the index is built go into a small overlay
+(`add`/`remove`) that every lookup also consults, so patching the index
+costs time proportional to the change rather than a rebuild.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 if it is larger
+    than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1,
+                       previous[j - 1] + (ca != cb))
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class NameIndex:
+
+    def __init__(self, person_ids, person_names, removed=()):
+        by_key = {}
+        for person, name in enumerate(person_names):
+            if person not in removed:
+                by_key.setdefault(name.lower(), []).append(person)
+
+        # sorted distinct lower-cased names, and the people under each
+        self.keys = sorted(by_key)
+        self.people = [by_key[key] for key in self.keys]
+        self.person_ids = person_ids
+
+        postings = {}
+        for k, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array("i")).append(k)
+        self.postings = postings
+
+        # length -> keys of that length, for queries too short for trigrams
+        lengths = {}
+        for k, key in enumerate(self.keys):
+            lengths.setdefault(len(key), array("i")).append(k)
+        self.lengths = lengths
+
+        # overlay: names added since building, and built entries withdrawn
+        self.added = {}
+        self.added_keys = []
+        self.withdrawn = set()
+
+    @classmethod
+    def from_graph(cls, graph):
+        return cls(graph.person_ids, graph.person_names,
+                   graph.removed_people)
+
+    def add(self, person, name):
+        """Indexes `person` under `name`."""
+        key = name.lower()
+        if (key, person) in self.withdrawn:
+            self.withdrawn.discard((key, person))
+            return
+        if key not in self.added:
+            self.added[key] = []
+            insort(self.added_keys, key)
+        self.added[key].append(person)
+
+    def remove(self, person, name):
+        """Stops finding `person` under `name`."""
+        key = name.lower()
+        people = self.added.get(key)
+        if people is not None and person in people:
+            people.remove(person)
+            if not people:
+                del self.added[key]
+                self.added_keys.remove(key)
+        else:
+            self.withdrawn.add((key, person))
+
+    def _live(self, key, people):
+        if not self.withdrawn:
+            return people
+        return [p for p in people if (key, p) not in self.withdrawn]
+
+    def exact(self, name):
+        """Person indices whose name is exactly `name`, ignoring case."""
+        key = name.lower()
+        found = []
+        k = bisect_left(self.keys, key)
+        if k < len(self.keys) and self.keys[k] == key:
+            found.extend(self._live(key, self.people[k]))
+        found.extend(self.added.get(key, ()))
+        return found
+
+    def prefix(self, prefix, limit=10):
+        """Up to `limit` person indices whose name starts with `prefix`."""
+        prefix = prefix.lower()
+        matches = []
+        k = bisect_left(self.keys, prefix)
+        count = 0
+        while (k < len(self.keys) and self.keys[k].startswith(prefix)
+               and count < limit):
+            people = self._live(self.keys[k], self.people[k])
+            matches.append((self.keys[k], people))
+            count += len(people)
+            k += 1
+        k = bisect_left(self.added_keys, prefix)
+        while (k < len(self.added_keys)
+               and self.added_keys[k].startswith(prefix)):
+            key = self.added_keys[k]
+            matches.append((key, self.added[key]))
+            k += 1
+        matches.sort(key=lambda match: match[0])
+
+        found = []
+        for _, people in matches:
+            found.extend(people)
+        return found[:limit]
+
+    def fuzzy(self, name, max_edits=2, limit=10):
+        """
+        Up to `limit` (edits, person) pairs for names within `max_edits`
+        edits of `name`, closest first.
+        """
+        key = name.lower()
+        grams = trigrams(key)
+        required = len(grams) - 3 * max_edits
+        if required <= 0:
+            # a name this close may share no trigram at all with the query
+            lists = []
+            counts = {k: 0
+                      for length in range(len(key) - max_edits,
+                                          len(key) + max_edits + 1)
+                      for k in self.lengths.get(length, ())}
+        else:
+            lists = sorted((self.postings.get(gram, ()) for gram in grams),
+                           key=len)
+            counts = {}
+        # any name sharing `required` trigrams is in one of these lists
+        seeding = len(grams) - required + 1
+
+        # count shared trigrams, rarest lists first
+        for i, posting in enumerate(lists):
+            if i < seeding:
+                for k in posting:
+                    counts[k] = counts.get(k, 0) + 1
+                continue
+            remaining = len(lists) - i
+            counts = {k: c for k, c in counts.items()
+                      if c + remaining >= required}
+            if not counts:
+                break
+            if len(counts) * 16 < len(posting):
+                # postings are sorted, so probe them for the few survivors
+                for k in counts:
+                    j = bisect_left(posting, k)
+                    if j < len(posting) and posting[j] == k:
+                        counts[k] += 1
+            else:
+                for k in posting:
+                    if k in counts:
+                        counts[k] += 1
+
+        scored = []
+        for k, shared in counts.items():
+            if shared < required:
+                continue
+            edits = edit_distance(key, self.keys[k], max_edits)
+            if edits <= max_edits:
+                scored.append((edits, self.keys[k],
+                               self._live(self.keys[k], self.people[k])))
+        for added_key, people in self.added.items():
+            edits = edit_distance(key, added_key, max_edits)
+            if edits <= max_edits:
+                scored.append((edits, added_key, people))
+        scored.sort(key=lambda score: score[:2])
+
+        found = []
+        for edits, _, people in scored:
+            for person in people:
+                found.append((edits, person))
+                if len(found) >= limit:
+                    return found
+        return found
+
+    def candidates(self, name, limit=10, max_edits=2):
+        """
+        Ranked person indices for a possibly partial or misspelled name:
+        exact matches, then prefix matches, then fuzzy matches.
+        """
+        ranked = []
+        seen = set()
+
+        def extend(people):
+            for person in people:
+                if person not in seen and len(ranked) < limit:
+                    seen.add(person)
+                    ranked.append(person)
+
+        extend(self.exact(name))
+        extend(self.prefix(name, limit))
+        extend(person for _, person in self.fuzzy(name, max_edits, limit))
+        return ranked
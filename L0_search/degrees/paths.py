@@ -0,0 +1,210 @@
+"""
+Every shortest path between two people, not just one of them.
+
+shortest_path_dag runs one layered BFS from the source and keeps, for
+each person, the movies through which they were first reached and, for
+each such movie, the cast members one layer closer to the source. Those
+movie-level links stand in for every co-star pair at once, so the DAG is
+never larger than the people and movies it touches, even when it encodes
+millions of equivalent chains. It is then pruned back to the part that
+actually leads to the target.
+
+PathDAG.paths() and PathDAG.best_paths() walk it lazily as generators,
+so callers can stop after any number of paths without ever
+materializing the rest.
+"""
+
+import heapq
+from itertools import islice
+
+
+class PathDAG:
+
+    def __init__(self, source, target, depth, parent_movies, movie_parents):
+        self.source = source
+        self.target = target
+        # number of degrees between source and target
+        self.depth = depth
+        # person -> movies linking them to the previous layer
+        self.parent_movies = parent_movies
+        # movie -> its cast members in the previous layer
+        self.movie_parents = movie_parents
+
+    def count(self):
+        """Number of distinct shortest paths, without enumerating them."""
+        counts = {self.source: 1}
+
+        def count_to(person):
+            # each person's predecessors are one layer closer, so the
+            # recursion is at most `depth` deep
+            if person not in counts:
+                counts[person] = sum(
+                    count_to(parent)
+                    for movie in self.parent_movies[person]
+                    for parent in self.movie_parents[movie])
+            return counts[person]
+
+        return count_to(self.target)
+
+    def paths(self, limit=None):
+        """
+        Yields the shortest paths as lists of (movie, person) index
+        pairs, stopping after `limit` of them if it is given.
+        """
+        return islice(self._paths(), limit)
+
+    def _paths(self):
+        if self.source == self.target:
+            yield []
+            return
+        # depth-first from the target back to the source; `suffix` holds
+        # the (movie, person) pairs chosen so far, closest to target last
+        suffix = []
+        stack = [self._links(self.target)]
+        while stack:
+            link = next(stack[-1], None)
+            if link is None:
+                stack.pop()
+                if suffix:
+                    suffix.pop()
+                continue
+            movie, parent, person = link
+            suffix.append((movie, person))
+            if parent == self.source:
+                yield suffix[::-1]
+                suffix.pop()
+            else:
+                stack.append(self._links(parent))
+
+    def _links(self, person):
+        for movie in self.parent_movies[person]:
+            for parent in self.movie_parents[movie]:
+                yield movie, parent, person
+
+    def best_paths(self, weight, limit=None):
+        """
+        Yields the shortest paths in increasing order of the total
+        `weight(movie)` of the movies along them, stopping after `limit`
+        of them if it is given.
+
+        The cheapest way to reach every person from the source is worked
+        out first, so a best-first search from the target never expands
+        a partial path that cannot be the next one out.
+        """
+        return islice(self._best_paths(weight), limit)
+
+    def _best_paths(self, weight):
+        if self.source == self.target:
+            yield []
+            return
+        costs = {}
+        best = {self.source: 0}
+
+        def best_to(person):
+            if person not in best:
+                best[person] = min(
+                    movie_cost(movie) + best_to(parent)
+                    for movie in self.parent_movies[person]
+                    for parent in self.movie_parents[movie])
+            return best[person]
+
+        def movie_cost(movie):
+            if movie not in costs:
+                costs[movie] = weight(movie)
+            return costs[movie]
+
+        # entries are (best total, -length of suffix, tiebreak, cost of
+        # suffix, head, suffix) where suffix is a linked list of
+        # (movie, person, rest); among equally good entries the longest
+        # suffix goes first, so ties are finished off depth-first
+        heap = [(best_to(self.target), 0, 0, 0, self.target, None)]
+        sequence = 1
+        while heap:
+            _, length, _, cost, person, suffix = heapq.heappop(heap)
+            if person == self.source:
+                path = []
+                while suffix is not None:
+                    movie, person, suffix = suffix
+                    path.append((movie, person))
+                yield path
+                continue
+            for movie, parent, _ in self._links(person):
+                step = cost + movie_cost(movie)
+                heapq.heappush(heap, (best_to(parent) + step, length - 1,
+                                      sequence, step, parent,
+                                      (movie, person, suffix)))
+                sequence += 1
+
+
+def shortest_path_dag(graph, source, target):
+    """
+    Builds the DAG of every shortest path from the person index `source`
+    to the person index `target`, or returns None if they are not
+    connected.
+    """
+    if source == target:
+        return PathDAG(source, target, 0, {}, {})
+
+    depth = {source: 0}
+    parent_movies = {}
+    movie_parents = {}
+    seen_movies = set()
+    layer = [source]
+    d = 0
+    while layer and target not in depth:
+        d += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_of(person):
+                if movie in seen_movies:
+                    continue
+                # the first time a movie is expanded its cast sits in this
+                # layer or the next, and everyone in this layer is known
+                seen_movies.add(movie)
+                cast = graph.people_in(movie)
+                reached = False
+                for costar in cast:
+                    if costar not in depth:
+                        depth[costar] = d
+                        next_layer.append(costar)
+                        parent_movies[costar] = []
+                    if depth[costar] == d:
+                        parent_movies[costar].append(movie)
+                        reached = True
+                if reached:
+                    movie_parents[movie] = [p for p in cast
+                                            if depth[p] == d - 1]
+        layer = next_layer
+
+    if target not in depth:
+        return None
+
+    # keep only what leads back from the target
+    kept_people = {target: parent_movies[target]}
+    kept_movies = {}
+    layer = [target]
+    while layer:
+        previous = []
+        for person in layer:
+            for movie in kept_people[person]:
+                if movie in kept_movies:
+                    continue
+                kept_movies[movie] = movie_parents[movie]
+                for parent in movie_parents[movie]:
+                    if parent != source and parent not in kept_people:
+                        kept_people[parent] = parent_movies[parent]
+                        previous.append(parent)
+        layer = previous
+    return PathDAG(source, target, d, kept_people, kept_movies)
+
+
+def recency(graph):
+    """
+    Movie weight for PathDAG.best_paths that prefers recent movies:
+    the newer a path's movies on the whole, the earlier it comes out.
+    Movies without a year count as the oldest.
+    """
+    def weight(movie):
+        year = graph.movie_years[movie]
+        return -int(year) if year.isdigit() else 0
+    return weight
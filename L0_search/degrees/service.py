@@ -0,0 +1,187 @@
+"""
+Answer many degrees queries against one loaded graph.
+
+Batch mode reads one query per line, either `source<TAB>target` or a JSON
+object with "source" and "target" keys, and writes one JSON result per
+line. Server mode loads the graph once and answers
+`GET /path?source=...&target=...` over HTTP from a thread per request.
+
+    python service.py large --batch pairs.tsv
+    python service.py large --batch - < pairs.tsv
+    python service.py large --serve 8000
+"""
+
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+class QueryError(Exception):
+    """Raised when a query cannot be answered as asked."""
+
+    def __init__(self, message, candidates=None):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def resolve(name):
+    """
+    Returns the person_id for a name, or for an id given as-is.
+    Ambiguous and unknown names raise QueryError instead of prompting,
+    as do names that are not strings (e.g. numbers or null in JSON).
+    """
+    if not isinstance(name, str):
+        raise QueryError(f"name is not a string: {json.dumps(name)}")
+    if name in degrees.people:
+        return name
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 1:
+        return person_ids[0]
+    if not person_ids:
+        message = f"person not found: {name}"
+        person_ids = degrees.person_candidates(name, limit=5)
+    else:
+        message = f"ambiguous name: {name}"
+    candidates = [
+        {
+            "id": person_id,
+            "name": degrees.people[person_id]["name"],
+            "birth": degrees.people[person_id]["birth"],
+        }
+        for person_id in person_ids
+    ]
+    raise QueryError(message, candidates)
+
+
+def answer(source_name, target_name):
+    """
+    Runs one query and returns a JSON-serializable result with the path,
+    the time it took and how many people the search expanded.
+    """
+    start = time.perf_counter()
+    result = {"source": source_name, "target": target_name}
+    stats = {"explored": 0}
+    try:
+        source = resolve(source_name)
+        target = resolve(target_name)
+        path = degrees.shortest_path(source, target, stats=stats)
+    except QueryError as e:
+        result["error"] = str(e)
+        if e.candidates is not None:
+            result["candidates"] = e.candidates
+    else:
+        if path is None:
+            result["degrees"] = None
+            result["path"] = None
+        else:
+            result["degrees"] = len(path)
+            result["path"] = [
+                {
+                    "movie_id": movie_id,
+                    "movie": degrees.graph.movie_titles[
+                        degrees.graph.movie_index[movie_id]],
+                    "person_id": person_id,
+                    "person": degrees.graph.person_names[
+                        degrees.graph.person_index[person_id]],
+                }
+                for movie_id, person_id in path
+            ]
+    result["explored"] = stats["explored"]
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def parse_query(line):
+    """Splits one batch line into (source, target) names."""
+    line = line.strip()
+    if line.startswith("{"):
+        query = json.loads(line)
+        return query["source"], query["target"]
+    source, target = line.split("\t")
+    return source, target
+
+
+def run_batch(infile, outfile):
+    """Answers every query in `infile`, one JSON line each, in order."""
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            source, target = parse_query(line)
+        except (ValueError, KeyError):
+            result = {"query": line.rstrip("\n"), "error": "malformed query"}
+        else:
+            result = answer(source, target)
+        outfile.write(json.dumps(result) + "\n")
+        outfile.flush()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if (url.path != "/path"
+                or "source" not in params or "target" not in params):
+            self.send_json(
+                400, {"error": "usage: /path?source=...&target=..."})
+            return
+        result = answer(params["source"][0], params["target"][0])
+        self.send_json(200 if "error" not in result else 404, result)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # results already carry their own latency; keep stderr quiet
+        pass
+
+
+def serve(host, port):
+    """Answers queries over HTTP until interrupted."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    print(f"Serving on http://{host}:{server.server_port}/path",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="service.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--batch", metavar="FILE",
+                      help="file of queries, or - for stdin")
+    mode.add_argument("--serve", metavar="PORT", type=int)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.serve is not None:
+        serve(args.host, args.serve)
+    elif args.batch == "-":
+        run_batch(sys.stdin, sys.stdout)
+    else:
+        with open(args.batch, encoding="utf-8") as f:
+            run_batch(f, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
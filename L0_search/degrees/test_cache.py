@@ -0,0 +1,69 @@
+import os
+import shutil
+
+import pytest
+
+from cache import load_cache, write_cache
+from ingest import load
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ("people.csv", "movies.csv", "stars.csv"):
+        shutil.copy(os.path.join(SMALL, name), tmp_path)
+    return str(tmp_path)
+
+
+def costars(graph, person_id):
+    person = graph.person_index[person_id]
+    return {graph.person_ids[costar] for _, costar in graph.neighbors(person)}
+
+
+def test_write_cache_keeps_applied_changes(directory):
+    graph = load(directory)
+    write_cache(graph, directory)
+    graph = load_cache(directory)
+    removed = graph.person_ids[3]
+    movie_id = graph.movie_ids[0]
+    graph.apply_changes(
+        add_people=[("x1", "New Person", "")],
+        add_stars=[("x1", movie_id)],
+        remove_people=[removed],
+    )
+    expected = costars(graph, "x1")
+
+    write_cache(graph, directory)
+    reloaded = load_cache(directory)
+
+    assert removed not in reloaded.person_index
+    assert costars(reloaded, "x1") == expected
+    assert removed not in costars(reloaded, "x1")
+    for person_id, person in reloaded.person_index.items():
+        assert costars(reloaded, person_id) == costars(graph, person_id)
+
+
+def test_write_cache_after_removing_and_adding_back(directory):
+    graph = load(directory)
+    write_cache(graph, directory)
+    graph = load_cache(directory)
+    person_id, name = graph.person_ids[2], graph.person_names[2]
+    movie_id, title = graph.movie_ids[1], graph.movie_titles[1]
+    costar_id = graph.person_ids[0]
+    graph.apply_changes(remove_people=[person_id], remove_movies=[movie_id])
+    graph.apply_changes(
+        add_people=[(person_id, name, "")],
+        add_movies=[(movie_id, title, "")],
+        add_stars=[(person_id, movie_id), (costar_id, movie_id)],
+    )
+
+    write_cache(graph, directory)
+    reloaded = load_cache(directory)
+
+    assert reloaded.person_ids.count(person_id) == 1
+    assert reloaded.movie_ids.count(movie_id) == 1
+    assert name.lower() in reloaded.name_index()
+    assert costars(reloaded, person_id) == {person_id, costar_id}
+    for person_id in reloaded.person_index:
+        assert costars(reloaded, person_id) == costars(graph, person_id)
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pytest
+
+from graph import Graph
+from ingest import load_streaming, load_vectorized, pd, same_graph
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+LOADERS = [Graph.from_csv, load_streaming] + (
+    [load_vectorized] if pd is not None else [])
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ("people.csv", "movies.csv", "stars.csv"):
+        shutil.copy(os.path.join(SMALL, name), tmp_path)
+    # Kevin Bacon and Apollo 13 again, and a movie nobody starred in
+    with open(tmp_path / "people.csv", "a", encoding="utf-8") as f:
+        f.write('102,"Kevin Bacon Jr",1960\n')
+    with open(tmp_path / "movies.csv", "a", encoding="utf-8") as f:
+        f.write('112384,"Apollo 13 (Remastered)",1995\n')
+        f.write('999,"Nobody Film",2020\n')
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("loader", LOADERS)
+def test_repeated_ids_and_empty_movies(directory, loader):
+    reference = Graph.from_csv(SMALL)
+    graph = loader(directory)
+
+    assert graph.person_ids.count("102") == 1
+    assert graph.movie_ids.count("112384") == 1
+    person = graph.person_index["102"]
+    assert graph.person_names[person] == "Kevin Bacon Jr"
+    movie = graph.movie_index["112384"]
+    assert graph.movie_titles[movie] == "Apollo 13 (Remastered)"
+    assert len(graph.people_in(graph.movie_index["999"])) == 0
+    assert len(graph.movie_offsets) == graph.num_movies() + 1
+    for person_id, person in reference.person_index.items():
+        assert ({graph.movie_ids[m]
+                 for m in graph.movies_of(graph.person_index[person_id])}
+                == {reference.movie_ids[m]
+                    for m in reference.movies_of(person)})
+    assert same_graph(graph, Graph.from_csv(directory))
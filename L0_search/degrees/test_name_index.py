@@ -0,0 +1,19 @@
+from name_index import NameIndex
+
+
+def index():
+    return NameIndex(["102", "129", "200"],
+                     ["Kevin Bacon", "Emma Watson", "Emma"])
+
+
+def test_fuzzy_short_misspelling_without_shared_trigrams():
+    # "amme" shares no trigram with "emma" but is two edits away
+    assert index().fuzzy("amme") == [(2, 2)]
+
+
+def test_fuzzy_short_misspelling():
+    assert index().fuzzy("Ema", max_edits=1) == [(1, 2)]
+
+
+def test_fuzzy_long_misspelling():
+    assert index().fuzzy("Kevn Bacon") == [(1, 0)]
@@ -0,0 +1,27 @@
+import io
+import json
+import os
+
+import degrees
+from service import run_batch
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def test_batch_rejects_names_that_are_not_strings():
+    degrees.load_data(SMALL, use_cache=False)
+    queries = [
+        {"source": 102, "target": "Tom Hanks"},
+        {"source": "Kevin Bacon", "target": None},
+        {"source": ["Kevin Bacon"], "target": "Tom Hanks"},
+        {"source": "Kevin Bacon", "target": "Tom Hanks"},
+    ]
+    infile = io.StringIO("".join(json.dumps(q) + "\n" for q in queries))
+    outfile = io.StringIO()
+    run_batch(infile, outfile)
+
+    results = [json.loads(line) for line in outfile.getvalue().splitlines()]
+    assert len(results) == len(queries)
+    for result in results[:3]:
+        assert result["error"].startswith("name is not a string")
+    assert results[3]["degrees"] == 1
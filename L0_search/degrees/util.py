@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node:
     def __init__(self, person, movie, parent):
         self.person = person
@@ -21,40 +24,84 @@ class Node:
 
 class StackFrontier:
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # person -> number of nodes for that person currently in the frontier
+        self.persons = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.persons[node.person] = self.persons.get(node.person, 0) + 1
 
     def contains_state(self, person):
-        return any(node.person == person for node in self.frontier)
+        return person in self.persons
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node)
             return node
 
+    def discard(self, node):
+        """Forget one frontier entry for node.person once it is removed."""
+        count = self.persons[node.person] - 1
+        if count:
+            self.persons[node.person] = count
+        else:
+            del self.persons[node.person]
+
 
 class QueueFrontier(StackFrontier):
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node)
             return node
 
 
-class GBFS(StackFrontier):
-    def remove(self):
-        if self.empty():
-            raise Exception("empty frontier")
-        node = max(self.frontier, key=lambda x: len(x.neighbours))
-        self.frontier.remove(node)
-        return node
+class VisitedMap:
+    """
+    Every person reached by a search, mapped to the (movie, person) step
+    that first reached them. People are marked visited when they are
+    enqueued, so each one enters the frontier at most once.
+    """
+
+    def __init__(self, start):
+        self.parents = {start: None}
+
+    def __contains__(self, person):
+        return person in self.parents
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, person, movie, parent):
+        """
+        Records that `person` was reached from `parent` through `movie`.
+        Returns False, and changes nothing, if `person` was already visited.
+        """
+        if person in self.parents:
+            return False
+        self.parents[person] = (movie, parent)
+        return True
+
+    def path_to(self, person):
+        """(movie, person) pairs leading from the start to `person`."""
+        path = []
+        step = self.parents[person]
+        while step is not None:
+            movie, parent = step
+            path.append((movie, person))
+            person = parent
+            step = self.parents[person]
+        path.reverse()
+        return path
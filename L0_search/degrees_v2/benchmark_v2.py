@@ -0,0 +1,120 @@
+"""
+Checks and times the heap-based PriorityFrontier.
+
+First it checks the frontier itself (priority order, first-in-first-out
+ties, decrease-key, closed set) and that A* on the dataset finds paths as
+short as breadth-first search. Then it times random add/remove workloads
+against the old bisect-and-insert AStar frontier.
+
+    python benchmark_v2.py large --ops 200000 --queries 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+
+import degrees_v2
+from util_v2 import Node, PriorityFrontier
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "degrees"))
+
+import degrees
+
+
+class BisectFrontier:
+    """The old AStar frontier: two parallel lists kept sorted by insertion."""
+
+    def __init__(self):
+        self.frontier = []
+        self.frontier_cost = []
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def add(self, node, priority):
+        index = bisect_left(self.frontier_cost, priority)
+        self.frontier.insert(index, node)
+        self.frontier_cost.insert(index, priority)
+
+    def remove(self):
+        self.frontier_cost.pop(0)
+        return self.frontier.pop(0)
+
+
+def check_frontier():
+    frontier = PriorityFrontier()
+    nodes = [Node(person, None, None, 1, cost=0) for person in range(6)]
+
+    # equal priorities come back in insertion order
+    for node, priority in zip(nodes, (2, 1, 2, 1, 3, 2)):
+        frontier.add(node, priority)
+    # decrease-key: person 4 moves from 3 to the front, a worse key is ignored
+    assert frontier.add(nodes[4], 0)
+    assert not frontier.add(nodes[0], 5)
+    order = [frontier.remove().person for _ in range(len(nodes))]
+    assert order == [4, 1, 3, 0, 2, 5], order
+    assert frontier.empty()
+
+    # closed people are never queued again
+    assert not frontier.add(nodes[1], 0)
+    print("frontier checks passed")
+
+
+def check_paths(pairs):
+    for source, target in pairs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            path = degrees_v2.shortest_path(source, target)
+        expected = degrees.shortest_path(source, target)
+        if (path is None) != (expected is None) or (
+                path is not None and len(path) != len(expected)):
+            raise SystemExit(f"A* path for {source} -> {target} is not "
+                             f"shortest: {path} vs {expected}")
+    print(f"A* matched BFS distances on {len(pairs)} queries")
+
+
+def time_frontier(frontier_class, ops, seed):
+    """Random interleaved adds and removes, returns operations per second."""
+    rng = random.Random(seed)
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for i in range(ops):
+        if frontier.empty() or rng.random() < 0.6:
+            node = Node(i, None, None, 1, cost=0)
+            frontier.add(node, rng.randint(0, 1000))
+        else:
+            frontier.remove()
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmark_v2.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_frontier()
+
+    directory = f"../degrees/{args.directory}"
+    degrees_v2.load_data(directory)
+    degrees.load_data(directory)
+    rng = random.Random(args.seed)
+    person_ids = degrees.graph.person_ids
+    check_paths([(rng.choice(person_ids), rng.choice(person_ids))
+                 for _ in range(args.queries)])
+
+    for name, frontier_class in (("bisect", BisectFrontier),
+                                 ("heap", PriorityFrontier)):
+        rate = time_frontier(frontier_class, args.ops, args.seed)
+        print(f"{name:<8} {rate:>12.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,40 @@
 # let's try to make this faster than normal degrees by using better data structures like dataframes
 # And let's try to implement A* algorithm of search
-import csv
+import argparse
+import math
+import os
 import sys
-import pandas as pd
 
+# the graph and its binary cache live alongside the original degrees project,
+# the search instrumentation one level up
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "degrees"))
+sys.path.insert(0, os.path.join(HERE, ".."))
 
-from util_v2 import Node, StackFrontier, QueueFrontier, AStar, Timer, TimerError
+from cache import append_changes, load_graph, write_cache
+from graph import PeopleView, MoviesView
+from instrument import Probe
+from landmarks import landmarks_path, read_landmarks
+from util_v2 import (Node, StackFrontier, QueueFrontier, PriorityFrontier,
+                     Timer, TimerError)
+
+# Interned actor-movie graph everything below is answered from
+graph = None
+
+# Precomputed landmark distances for the A* heuristic, if built
+landmarks = None
+
+# Directory the graph was loaded from
+data_directory = None
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+people = PeopleView()
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+movies = MoviesView()
 
 
 # TODO
@@ -23,53 +43,77 @@ movies = {}
 # need to try A*
 
 
-def load_data(directory):
+def load_data(directory, use_cache=True):
     """
-    Load data from CSV files into memory.
+    Load data into memory, from the binary cache in `directory` if it is
+    up to date with the CSV files and from the CSV files otherwise.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set(),
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set(),
-            }
+    global graph, landmarks, data_directory
+    graph = load_graph(directory, use_cache=use_cache)
+    landmarks = read_landmarks(landmarks_path(directory), graph, directory)
+    names.clear()
+    names.update(graph.name_index())
+    people.graph = graph
+    movies.graph = graph
+    data_directory = directory
 
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+def apply_changes(**changes):
+    """
+    Applies a batch of additions and removals to the loaded graph (see
+    Graph.apply_changes), patches `names`, and journals the batch next to
+    the binary cache if there is one.
+
+    Landmark distances are patched in place when the batch only adds
+    stars. Removals can lengthen distances, which would make the bounds
+    inadmissible, so they drop the landmarks until landmarks.py is rerun.
+    """
+    global landmarks
+    result = graph.apply_changes(**changes)
+    for person, old_name, new_name in result["renamed"]:
+        person_id = graph.person_ids[person]
+        if old_name is not None:
+            ids = names.get(old_name.lower())
+            if ids is not None:
+                ids.discard(person_id)
+                if not ids:
+                    del names[old_name.lower()]
+        if new_name is not None:
+            names.setdefault(new_name.lower(), set()).add(person_id)
+
+    if landmarks is not None:
+        if (changes.get("remove_stars") or changes.get("remove_movies")
+                or changes.get("remove_people")):
+            landmarks = None
+        else:
+            touched_movies = {
+                graph.movie_index[movie_id]
+                for _, movie_id in changes.get("add_stars", ())
+                if movie_id in graph.movie_index
+            }
+            landmarks.patch_added_stars(graph, touched_movies)
+    if data_directory is not None:
+        append_changes(data_directory, changes)
+    return result
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(prog="degrees_v2.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--build-cache", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    directory = f"../degrees/{args.directory}"
+
+    if args.build_cache:
+        print("Building cache...")
+        path = write_cache(load_graph(directory, use_cache=False), directory)
+        print(f"Cache written to {path}.")
+        return
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(f"../degrees/{directory}")
+    load_data(directory, use_cache=not args.no_cache)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -81,7 +125,9 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    probe = Probe()
+    path = shortest_path(source, target, probe=probe)
+    print(f"number of states explored = {probe.expanded}")
 
     if path is None:
         print("Not connected.")
@@ -96,52 +142,83 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, algorithm="astar", probe=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    algorithm="astar" orders the frontier by cost so far plus a lower
+    bound on the remaining degrees and tests for the target when a person
+    is removed. The bound comes from the precomputed landmarks (see
+    landmarks.py) when they have been built, which keeps A* optimal while
+    exploring far fewer people; otherwise the connectivity heuristic is
+    used. algorithm="gbfs" is greedy best-first: it always expands the
+    best-connected person next and stops as soon as the target is
+    generated, so its path need not be the shortest.
+
+    If `probe` is an instrument.Probe, every expansion is reported to it.
     If no possible path, returns None.
     """
+    if algorithm not in ("astar", "gbfs"):
+        raise ValueError(f"unknown algorithm: {algorithm}")
+    if source == target:
+        return []
+    source = graph.person_index[source]
+    target = graph.person_index[target]
 
     source_node = Node(
         person=source,
         movie=None,
         parent=None,
-        neighbours=neighbors_for_person(source),
+        degree=graph.degree(source),
         cost=0,
     )
 
-    frontier = AStar()
-    frontier.add(source_node)
-    success_path = None
-    explored_persons = []
+    frontier = PriorityFrontier()
+    frontier.add(source_node, priority(source_node, target, algorithm))
     while not frontier.empty():
 
         node = frontier.remove()
-        explored_persons.append(node.person)
-        if len(explored_persons) % 100 == 0:
-            print(f"explored = {len(explored_persons)}")
-
-        # let's check if a neighbour is the target
-        success_neighbour = is_target_neighbour(node.neighbours, target)
-        if success_neighbour:
-            success_path = node.get_path_to_target(success_neighbour)
-            print(f"number of states explored = {len(explored_persons)}")
-            return success_path
-        else:
-            for neighbour in node.neighbours:
-                person = neighbour[1]
-                if person in explored_persons:
-                    continue
-                movie = neighbour[0]
-                new_node = Node(person, movie, node, neighbors_for_person(person))
-                frontier.add(new_node)
-
-    print(f"number of states explored = {len(explored_persons)}")
+        if probe is not None:
+            probe.expand(len(frontier))
+
+        if node.person == target:
+            return path_to_ids(node.get_path_to_target())
+
+        for movie, person in graph.neighbors(node.person):
+            if person in frontier.closed:
+                continue
+            child = Node(person, movie, node, graph.degree(person))
+            if algorithm == "gbfs" and person == target:
+                return path_to_ids(child.get_path_to_target())
+            child_priority = priority(child, target, algorithm)
+            # landmarks can prove a person cannot reach the target at all
+            if child_priority == math.inf:
+                continue
+            frontier.add(child, child_priority)
+
     return None
 
 
+def priority(node, target, algorithm):
+    """Frontier priority of `node` for the given search algorithm."""
+    if algorithm == "gbfs":
+        # most neighbours first
+        return -node.degree
+    if landmarks is not None:
+        return node.cost + landmarks.lower_bound(node.person, target)
+    return node.total_cost
+
+
+def path_to_ids(path):
+    """
+    Converts a list of (movie, person) index pairs into
+    (movie_id, person_id) pairs.
+    """
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
 def is_target_neighbour(neighbours, target):
     """returns a tuple (movie, person) from the neighbours
     list if one of the neighbours has the target.
@@ -185,12 +262,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    person = graph.person_index[person_id]
+    return {(graph.movie_ids[movie], graph.person_ids[neighbour])
+            for movie, neighbour in graph.neighbors(person)}
 
 
 if __name__ == "__main__":
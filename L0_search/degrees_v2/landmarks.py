@@ -0,0 +1,211 @@
+"""
+Landmark (ALT) lower bounds for A* over the degrees graph.
+
+An offline pass picks the K best-connected people as landmarks and stores
+the breadth-first distance from each landmark to every person. By the
+triangle inequality, for any landmark L
+
+    dist(v, t) >= |dist(L, t) - dist(L, v)|
+
+so the largest of those differences is an admissible, consistent
+heuristic for A*.
+
+    python landmarks.py large --k 16
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "degrees"))
+
+from cache import SOURCE_STAT, SOURCES, load_graph, source_stats
+
+MAGIC = b"DEGLMRK4"
+LANDMARKS_NAME = "landmarks.bin"
+# distances are stored as unsigned 16-bit ints; this one means unreachable
+UNREACHABLE = 0xFFFF
+
+# magic, number of landmarks, number of people, and the generation and
+# journal bytes of the graph cache the graph came from (both 0 for the
+# CSVs); then the size and mtime of each source CSV
+HEADER = struct.Struct("<8sIIqq")
+
+
+class Landmarks:
+
+    def __init__(self, landmarks, distances):
+        # person indices of the landmarks
+        self.landmarks = landmarks
+        # one array("H") per landmark, indexed by person
+        self.distances = distances
+
+    def lower_bound(self, person, target):
+        """
+        Admissible estimate of the number of degrees from person to target.
+        Returns math.inf if some landmark proves they are not connected.
+        """
+        best = 0
+        for distance in self.distances:
+            to_person = distance[person]
+            to_target = distance[target]
+            if to_person == UNREACHABLE or to_target == UNREACHABLE:
+                if to_person != to_target:
+                    return math.inf
+                continue
+            bound = to_target - to_person
+            if bound < 0:
+                bound = -bound
+            if bound > best:
+                best = bound
+        return best
+
+    def patch_added_stars(self, graph, movies):
+        """
+        Brings the distances up to date after star edges were added to
+        `movies`. Adding edges can only shorten distances, so each change
+        is relaxed outwards from the movie's cast, touching only the
+        people whose distance actually drops. New people are appended as
+        unreachable first.
+        """
+        for distance in self.distances:
+            missing = graph.num_people() - len(distance)
+            if missing > 0:
+                distance.extend([UNREACHABLE] * missing)
+            queue = deque()
+            for movie in movies:
+                cast = graph.people_in(movie)
+                best = min((distance[p] for p in cast), default=UNREACHABLE)
+                if best == UNREACHABLE:
+                    continue
+                for person in cast:
+                    if distance[person] > best + 1:
+                        distance[person] = best + 1
+                        queue.append(person)
+            while queue:
+                person = queue.popleft()
+                step = distance[person] + 1
+                for _, costar in graph.neighbors(person):
+                    if distance[costar] > step:
+                        distance[costar] = step
+                        queue.append(costar)
+
+
+def landmarks_path(directory):
+    return os.path.join(directory, LANDMARKS_NAME)
+
+
+def select_landmarks(graph, k):
+    """The `k` people with the most co-star links."""
+    people = range(graph.num_people())
+    return sorted(people, key=graph.degree, reverse=True)[:k]
+
+
+def bfs_distances(graph, source):
+    """
+    Degrees of separation from `source` to every person, as an
+    array("H") with UNREACHABLE for people in other components.
+
+    Each movie's cast is scanned once, the first time any of its stars is
+    expanded, which is much cheaper than walking every co-star pair.
+    """
+    distances = array("H", [UNREACHABLE]) * graph.num_people()
+    seen_movies = bytearray(graph.num_movies())
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for costar in graph.people_in(movie):
+                    if distances[costar] == UNREACHABLE:
+                        distances[costar] = depth
+                        next_layer.append(costar)
+        layer = next_layer
+    return distances
+
+
+def build_landmarks(graph, k=16):
+    landmarks = select_landmarks(graph, k)
+    return Landmarks(landmarks,
+                     [bfs_distances(graph, landmark) for landmark in landmarks])
+
+
+def write_landmarks(landmarks, path, graph, directory):
+    num_people = len(landmarks.distances[0]) if landmarks.distances else 0
+    stats = source_stats(directory) or [(0, 0)] * len(SOURCES)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(landmarks.landmarks), num_people,
+                            graph.generation, graph.journaled))
+        for size, mtime in stats:
+            f.write(SOURCE_STAT.pack(size, mtime))
+        array("i", landmarks.landmarks).tofile(f)
+        for distance in landmarks.distances:
+            distance.tofile(f)
+
+
+def read_landmarks(path, graph, directory):
+    """
+    Loads landmarks written by write_landmarks. Returns None if the file
+    is missing or was built for a different graph: one of another size,
+    from other source CSVs, or from another cache or point in its journal
+    than `graph` was loaded from.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            return None
+        magic, k, num_people, generation, journaled = HEADER.unpack(header)
+        if (magic != MAGIC or num_people != graph.num_people()
+                or generation != graph.generation
+                or journaled != graph.journaled):
+            return None
+        data = f.read(SOURCE_STAT.size * len(SOURCES))
+        if len(data) != SOURCE_STAT.size * len(SOURCES):
+            return None
+        stats = list(SOURCE_STAT.iter_unpack(data))
+        if stats != (source_stats(directory) or [(0, 0)] * len(SOURCES)):
+            return None
+        landmarks = array("i")
+        landmarks.fromfile(f, k)
+        distances = []
+        for _ in range(k):
+            distance = array("H")
+            distance.fromfile(f, num_people)
+            distances.append(distance)
+    return Landmarks(list(landmarks), distances)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="landmarks.py")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--k", type=int, default=16,
+                        help="number of landmarks")
+    args = parser.parse_args()
+    directory = f"../degrees/{args.directory}"
+
+    print("Loading data...")
+    graph = load_graph(directory)
+    print(f"Computing distances from {args.k} landmarks...")
+    landmarks = build_landmarks(graph, args.k)
+    path = landmarks_path(directory)
+    write_landmarks(landmarks, path, graph, directory)
+    print(f"Landmarks written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import pytest
+
+import degrees_v2
+from cache import load_graph, write_cache
+from landmarks import (UNREACHABLE, bfs_distances, build_landmarks,
+                       landmarks_path, write_landmarks)
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                     "..", "degrees", "small")
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ("people.csv", "movies.csv", "stars.csv"):
+        shutil.copy(os.path.join(SMALL, name), tmp_path)
+    directory = str(tmp_path)
+    write_cache(load_graph(directory, use_cache=False), directory)
+    graph = load_graph(directory)
+    write_landmarks(build_landmarks(graph, 4), landmarks_path(directory),
+                    graph, directory)
+    return directory
+
+
+def check_astar(graph, landmarks):
+    for source in range(graph.num_people()):
+        distances = bfs_distances(graph, source)
+        for target in range(graph.num_people()):
+            expected = distances[target]
+            if landmarks is not None:
+                assert landmarks.lower_bound(source, target) <= expected
+            path = degrees_v2.shortest_path(graph.person_ids[source],
+                                            graph.person_ids[target])
+            if expected == UNREACHABLE:
+                assert path is None
+            else:
+                assert len(path) == expected
+
+
+def test_landmarks_after_changes_and_cache_rewrite(directory):
+    degrees_v2.load_data(directory)
+    assert degrees_v2.landmarks is not None
+    graph = degrees_v2.graph
+    movie_id = graph.movie_ids[0]
+    degrees_v2.apply_changes(
+        add_stars=[(person_id, movie_id) for person_id in graph.person_ids])
+    write_cache(graph, directory)
+
+    degrees_v2.load_data(directory)
+    check_astar(degrees_v2.graph, degrees_v2.landmarks)
+
+
+def test_landmarks_not_loaded_without_the_journal(directory):
+    degrees_v2.load_data(directory)
+    graph = degrees_v2.graph
+    degrees_v2.apply_changes(
+        add_stars=[(graph.person_ids[0], movie_id)
+                   for movie_id in graph.movie_ids])
+    graph = load_graph(directory)
+    write_landmarks(build_landmarks(graph, 4), landmarks_path(directory),
+                    graph, directory)
+
+    degrees_v2.load_data(directory, use_cache=False)
+    assert degrees_v2.landmarks is None
+    check_astar(degrees_v2.graph, degrees_v2.landmarks)
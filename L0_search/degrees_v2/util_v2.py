@@ -1,14 +1,16 @@
 import time
 import copy
-from bisect import bisect_left
+import heapq
+import itertools
+from collections import deque
 
 
 class Node:
-    def __init__(self, person, movie, parent, neighbours, cost=None):
+    def __init__(self, person, movie, parent, degree, cost=None):
         self.person = person
         self.parent = parent
-        self.neighbours = neighbours
-        self.connectivity = 1 / len(neighbours)
+        self.degree = degree
+        self.connectivity = 1 / degree if degree else 1
         self.movie = movie
         if cost is None:
             self.cost = self.parent.cost + 1
@@ -32,14 +34,17 @@ class Node:
 
 class StackFrontier:
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # person -> number of nodes for that person currently in the frontier
+        self.persons = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.persons[node.person] = self.persons.get(node.person, 0) + 1
         return
 
     def contains_state(self, person):
-        return any(node.person == person for node in self.frontier)
+        return person in self.persons
 
     def empty(self):
         return len(self.frontier) == 0
@@ -48,44 +53,85 @@ class StackFrontier:
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node)
             return node
 
+    def discard(self, node):
+        """Forget one frontier entry for node.person once it is removed."""
+        count = self.persons[node.person] - 1
+        if count:
+            self.persons[node.person] = count
+        else:
+            del self.persons[node.person]
+
 
 class QueueFrontier(StackFrontier):
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node)
             return node
 
 
-class AStar(QueueFrontier):
-    def __init__(self):
-        self.frontier = []
-        self.frontier_cost = []
-        return
+class PriorityFrontier:
+    """
+    Binary-heap frontier that always removes the node with the lowest
+    priority, first-in-first-out among equal priorities.
 
-    def remove(self):
-        if self.empty():
-            raise Exception("empty frontier")
-        else:
-            node = self.frontier.pop(0)
-            self.frontier = self.frontier[1:]
+    Adding a person who is already in the frontier with a lower priority
+    replaces the old entry (decrease-key by lazy deletion: the stale heap
+    entry is marked dead and skipped when it surfaces). Removed people go
+    into a closed set and are never added again.
+    """
 
-            self.frontier_cost.remove(node.total_cost)
-            return node
+    def __init__(self):
+        self.heap = []
+        # person -> live heap entry [priority, sequence, node, alive]
+        self.entries = {}
+        self.closed = set()
+        self.sequence = itertools.count()
+
+    def add(self, node, priority):
+        """
+        Adds `node` with `priority`. Returns False if its person is closed
+        or already queued at an equal or better priority.
+        """
+        person = node.person
+        if person in self.closed:
+            return False
+        entry = self.entries.get(person)
+        if entry is not None:
+            if entry[0] <= priority:
+                return False
+            entry[3] = False
+        entry = [priority, next(self.sequence), node, True]
+        self.entries[person] = entry
+        heapq.heappush(self.heap, entry)
+        return True
 
-    def add(self, node):
+    def contains_state(self, person):
+        return person in self.entries
 
-        index = bisect_left(self.frontier_cost, node.total_cost)
-        self.frontier.insert(index, node)
-        self.frontier_cost.insert(index, node.total_cost)
+    def empty(self):
+        return len(self.entries) == 0
 
-        return
+    def __len__(self):
+        return len(self.entries)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        heap = self.heap
+        while True:
+            priority, _, node, alive = heapq.heappop(heap)
+            if alive:
+                break
+        del self.entries[node.person]
+        self.closed.add(node.person)
+        return node
 
 
 import time
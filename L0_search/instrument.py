@@ -0,0 +1,119 @@
+"""
+Counters for the searches in L0_search.
+
+Every search takes an optional `probe`. Left as None, the search does
+nothing extra beyond one `is not None` test per expansion. Given a Probe,
+it calls probe.expand(frontier_size) once per node it expands, and the
+probe keeps the number of nodes expanded, the peak frontier size, the time
+between expansions and, if asked, the peak memory allocated while it ran.
+
+    probe = Probe("bfs")
+    with probe:
+        degrees.shortest_path(source, target, probe=probe)
+    print(probe.result())
+
+write_results saves a list of results as JSON or CSV.
+"""
+
+import csv
+import json
+import time
+import tracemalloc
+
+FIELDS = (
+    "name", "expanded", "frontier_peak", "seconds",
+    "mean_expansion_us", "max_expansion_us", "memory_peak_bytes",
+)
+
+
+class Probe:
+
+    def __init__(self, name="", trace_memory=False, report_every=0):
+        self.name = name
+        self.trace_memory = trace_memory
+        # print progress every this many expansions, if non-zero
+        self.report_every = report_every
+        # extra columns for the result, e.g. the length of the path found
+        self.info = {}
+        self.reset()
+
+    def reset(self):
+        self.expanded = 0
+        self.frontier_peak = 0
+        self.max_gap = 0.0
+        self.seconds = None
+        self.memory_peak = None
+        self._started = None
+        self._last = None
+
+    def start(self):
+        self.reset()
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = self._last = time.perf_counter()
+        return self
+
+    def stop(self):
+        now = time.perf_counter()
+        self.seconds = now - self._started
+        if self.trace_memory:
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expand(self, frontier_size):
+        """Records one expanded node, with `frontier_size` still queued."""
+        now = time.perf_counter()
+        if self._last is not None and now - self._last > self.max_gap:
+            self.max_gap = now - self._last
+        self._last = now
+        self.expanded += 1
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
+        if self.report_every and self.expanded % self.report_every == 0:
+            print(f"num explored = {self.expanded}")
+
+    def result(self):
+        seconds = self.seconds
+        if seconds is None and self._started is not None:
+            seconds = time.perf_counter() - self._started
+        mean = seconds / self.expanded if seconds and self.expanded else 0.0
+        result = {
+            "name": self.name,
+            "expanded": self.expanded,
+            "frontier_peak": self.frontier_peak,
+            "seconds": seconds,
+            "mean_expansion_us": mean * 1e6,
+            "max_expansion_us": self.max_gap * 1e6,
+            "memory_peak_bytes": self.memory_peak,
+        }
+        result.update(self.info)
+        return result
+
+
+def write_results(results, path, format=None):
+    """
+    Writes a list of Probe.result() dicts to `path` as JSON or CSV,
+    picked from the extension unless `format` is given.
+    """
+    if format is None:
+        format = "csv" if path.endswith(".csv") else "json"
+    if format == "json":
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        return
+    if format != "csv":
+        raise ValueError(f"unknown format: {format}")
+
+    columns = list(FIELDS)
+    for result in results:
+        columns.extend(key for key in result if key not in columns)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        writer.writerows(results)
@@ -0,0 +1,178 @@
+"""
+Compares the L0 searches on the bundled mazes and the degrees dataset.
+
+Each maze in src/ is solved with depth-first, breadth-first, greedy
+best-first and A* search, and with the array-backed breadth-first, A*
+and jump point searches in src/grid.py. On the degrees graph, random
+pairs of people are connected with the one-sided and bidirectional BFS
+from degrees.py and the greedy best-first and A* searches from
+degrees_v2.py. With --generate, seeded random mazes of each given size
+(in rooms per side, see src/generate.py) are solved with the grid
+searches as a scalability suite. Every run
+is timed with an instrument.Probe; the results are summed per algorithm
+on stdout and, with --output, written one row per run as JSON or CSV.
+
+    python search_benchmark.py --degrees small --pairs 50 --output runs.csv
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "src"))
+sys.path.insert(0, os.path.join(HERE, "degrees_v2"))
+sys.path.insert(0, os.path.join(HERE, "degrees"))
+
+import degrees
+import degrees_v2
+import grid
+from generate import generate
+from instrument import Probe, write_results
+from maze import Maze, NoSolution
+
+MAZE_ALGORITHMS = ("dfs", "bfs", "gbfs", "astar")
+GRID_ALGORITHMS = ("bfs", "astar", "jps")
+DEGREES_ALGORITHMS = ("bfs", "bidirectional", "gbfs", "astar")
+
+
+def run(name, search, trace_memory, **info):
+    probe = Probe(name, trace_memory=trace_memory)
+    with probe:
+        length = search(probe)
+    probe.info.update(info, path_length=length)
+    return probe.result()
+
+
+def bench_mazes(paths, trace_memory=False):
+    results = []
+    for path in paths:
+        maze = Maze(path)
+        for algorithm in MAZE_ALGORITHMS:
+
+            def search(probe):
+                try:
+                    maze.solve(algorithm, probe=probe)
+                except NoSolution:
+                    return None
+                return len(maze.solution[0])
+
+            results.append(run(algorithm, search, trace_memory,
+                               dataset=os.path.basename(path)))
+        for algorithm in GRID_ALGORITHMS:
+
+            def search(probe):
+                try:
+                    maze.solve_grid(algorithm, probe=probe)
+                except NoSolution:
+                    return None
+                return len(maze.solution[0])
+
+            results.append(run(f"grid-{algorithm}", search, trace_memory,
+                               dataset=os.path.basename(path)))
+    return results
+
+
+def bench_generated(sizes, seed=0, loops=0.0, trace_memory=False):
+    results = []
+    for size in sizes:
+        maze = generate(size, size, seed, loops)
+        for algorithm in GRID_ALGORITHMS:
+
+            def search(probe):
+                solution = grid.solve(maze, algorithm, probe).solution
+                return None if solution is None else len(solution[0])
+
+            results.append(run(f"grid-{algorithm}", search, trace_memory,
+                               dataset=f"gen{size}"))
+    return results
+
+
+def degrees_search(algorithm, source, target):
+    if algorithm == "bfs":
+        return lambda probe: degrees.shortest_path(
+            source, target, bidirectional=False, probe=probe)
+    if algorithm == "bidirectional":
+        return lambda probe: degrees.shortest_path(source, target,
+                                                   probe=probe)
+    return lambda probe: degrees_v2.shortest_path(source, target, algorithm,
+                                                  probe=probe)
+
+
+def bench_degrees(directory, pairs, seed=0, trace_memory=False):
+    degrees.load_data(directory)
+    degrees_v2.load_data(directory)
+    person_ids = list(degrees.people)
+    rng = random.Random(seed)
+    queries = [tuple(rng.sample(person_ids, 2)) for _ in range(pairs)]
+
+    results = []
+    for source, target in queries:
+        for algorithm in DEGREES_ALGORITHMS:
+            search = degrees_search(algorithm, source, target)
+
+            def measured(probe):
+                path = search(probe)
+                return None if path is None else len(path)
+
+            results.append(run(algorithm, measured, trace_memory,
+                               dataset=os.path.basename(directory),
+                               query=f"{source}->{target}"))
+    return results
+
+
+def summarize(results):
+    totals = {}
+    for result in results:
+        key = (result["dataset"], result["name"])
+        total = totals.setdefault(key, {"runs": 0, "expanded": 0,
+                                        "seconds": 0.0, "frontier_peak": 0})
+        total["runs"] += 1
+        total["expanded"] += result["expanded"]
+        total["seconds"] += result["seconds"]
+        total["frontier_peak"] = max(total["frontier_peak"],
+                                     result["frontier_peak"])
+
+    print(f"{'dataset':<12} {'algorithm':<14} {'runs':>5} {'expanded':>10} "
+          f"{'peak':>8} {'seconds':>10} {'us/node':>9}")
+    for (dataset, name), total in totals.items():
+        per_node = (total["seconds"] / total["expanded"] * 1e6
+                    if total["expanded"] else 0.0)
+        print(f"{dataset:<12} {name:<14} {total['runs']:>5} "
+              f"{total['expanded']:>10} {total['frontier_peak']:>8} "
+              f"{total['seconds']:>10.4f} {per_node:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="search_benchmark.py")
+    parser.add_argument("--mazes", nargs="*",
+                        default=sorted(glob.glob(os.path.join(HERE, "src",
+                                                              "maze*.txt"))))
+    parser.add_argument("--generate", nargs="*", type=int, default=[],
+                        metavar="ROOMS", help="sizes of random mazes to add")
+    parser.add_argument("--loops", type=float, default=0.05,
+                        help="fraction of inner walls removed from them")
+    parser.add_argument("--degrees", default="large",
+                        help="degrees dataset to query, or '' to skip it")
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true",
+                        help="also record peak memory (slows searches down)")
+    parser.add_argument("--output", help="write every run to a .json or .csv")
+    args = parser.parse_args()
+
+    results = bench_mazes(args.mazes, args.memory)
+    results += bench_generated(args.generate, args.seed, args.loops,
+                               args.memory)
+    if args.degrees:
+        results += bench_degrees(os.path.join(HERE, "degrees", args.degrees),
+                                 args.pairs, args.seed, args.memory)
+    summarize(results)
+    if args.output:
+        write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Random mazes of any size, for testing the searches at scale.
+
+generate carves a perfect maze (exactly one path between any two cells)
+with an iterative recursive backtracker, then optionally knocks out a
+fraction of the remaining inner walls so there are loops and many routes
+to the goal. The same seed always gives the same maze.
+
+    python generate.py 1000 1000 --seed 0 --loops 0.05 -o big.txt
+"""
+
+import argparse
+import random
+from array import array
+
+from grid import OPEN, Grid, save
+
+
+def generate(rows, cols, seed=0, loops=0.0):
+    """
+    Returns a Grid of (2 * rows + 1) x (2 * cols + 1) cells: a maze of
+    rows x cols rooms separated by walls, with the start in the top-left
+    room and the goal in the bottom-right one.
+    """
+    rng = random.Random(seed)
+    grid = Grid(2 * rows + 1, 2 * cols + 1)
+    walls = grid.walls
+    stride = grid.stride
+    # rooms sit at odd rows and columns, which in the grid's padded
+    # indices puts them at even rows and columns from 2 to 2 * rows (cols)
+    last_row, last_col = 2 * rows, 2 * cols
+
+    start = grid.index(1, 1)
+    walls[start] = OPEN
+    stack = array("i", [start])
+    while stack:
+        room = stack[-1]
+        row, col = divmod(room, stride)
+        # rooms not carved out yet are still walls
+        options = []
+        if row > 2 and walls[room - 2 * stride]:
+            options.append(-stride)
+        if row < last_row and walls[room + 2 * stride]:
+            options.append(stride)
+        if col > 2 and walls[room - 2]:
+            options.append(-1)
+        if col < last_col and walls[room + 2]:
+            options.append(1)
+        if not options:
+            stack.pop()
+            continue
+        step = rng.choice(options)
+        walls[room + step] = OPEN
+        walls[room + 2 * step] = OPEN
+        stack.append(room + 2 * step)
+
+    if loops > 0:
+        # inner walls between two rooms, horizontally or vertically
+        for i in range(1, 2 * rows):
+            for j in range(1 + i % 2, 2 * cols, 2):
+                if rng.random() < loops:
+                    walls[grid.index(i, j)] = OPEN
+
+    grid.start = start
+    grid.goal = grid.index(2 * rows - 1, 2 * cols - 1)
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="generate.py")
+    parser.add_argument("rows", type=int, help="rooms per column")
+    parser.add_argument("cols", type=int, help="rooms per row")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loops", type=float, default=0.0,
+                        help="fraction of inner walls to remove")
+    parser.add_argument("-o", "--output", default="generated.txt")
+    args = parser.parse_args()
+
+    grid = generate(args.rows, args.cols, args.seed, args.loops)
+    save(grid, args.output)
+    print(f"{grid.height} x {grid.width} maze written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
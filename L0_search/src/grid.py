@@ -0,0 +1,393 @@
+"""
+Array-backed maze search.
+
+A Grid keeps its walls in one bytearray, padded with a border of walls so
+that the four neighbours of a cell are always at index -stride, +stride,
+-1 and +1 with no bounds checks. Instead of a Node per state, the searches
+keep one byte per cell saying which move first reached it; following
+those moves backwards from the goal gives the path. With the walls, that
+is two bytes per cell, so a 10k x 10k maze fits in a few hundred MB.
+
+bfs, astar and jps all return a Result whose `solution` is the same
+(actions, cells) tuple Maze.solve produces, or None if the goal cannot
+be reached.
+
+load reads a maze text file straight into a Grid, a line at a time, and
+save writes one back out, so neither ever holds the text of the whole
+maze.
+"""
+
+import heapq
+
+WALL = 1
+OPEN = 0
+
+# maps every byte of a maze line to WALL except for open cells, start and goal
+CELLS = bytes(OPEN if chr(b) in " AB" else WALL for b in range(256))
+# maps WALL and OPEN back to maze text
+TEXT = bytes.maketrans(bytes([OPEN, WALL]), b" #")
+
+# codes kept per cell for the move that reached it; 0 means not reached
+UP, DOWN, LEFT, RIGHT, START = 1, 2, 3, 4, 5
+ACTIONS = {UP: "up", DOWN: "down", LEFT: "left", RIGHT: "right"}
+
+
+class Grid:
+
+    def __init__(self, height, width, walls=None, start=None, goal=None):
+        """
+        `walls` holds height * width bytes in row-major order, non-zero
+        for a wall, and defaults to all walls; `start` and `goal` are
+        (row, col) cells.
+        """
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        padded = bytearray([WALL]) * (self.stride * (height + 2))
+        if walls is not None:
+            for i in range(height):
+                row = (i + 1) * self.stride + 1
+                padded[row:row + width] = walls[i * width:(i + 1) * width]
+        self.walls = padded
+        self.start = None if start is None else self.index(*start)
+        self.goal = None if goal is None else self.index(*goal)
+
+    def rows(self):
+        """
+        One read-only view of the walls per row, so grid.rows()[i][j] is
+        non-zero for a wall, as with a list of lists of bools.
+        """
+        view = memoryview(self.walls).toreadonly()
+        return [view[self.index(i, 0):self.index(i, self.width)]
+                for i in range(self.height)]
+
+    def index(self, row, col):
+        return (row + 1) * self.stride + col + 1
+
+    def cell(self, index):
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def is_wall(self, row, col):
+        return self.walls[self.index(row, col)] != OPEN
+
+    def distance_to_goal(self, index):
+        """Manhattan distance from the cell at `index` to the goal."""
+        row, col = divmod(index, self.stride)
+        goal_row, goal_col = divmod(self.goal, self.stride)
+        return abs(row - goal_row) + abs(col - goal_col)
+
+
+class CellSet:
+    """
+    Read-only set of the (row, col) cells whose byte in `mask` is
+    non-zero, where `mask` runs over the grid's padded indices. Keeps
+    `(i, j) in cells` O(1) without building a set of tuples.
+    """
+
+    def __init__(self, grid, mask):
+        self.grid = grid
+        self.mask = mask
+
+    def __contains__(self, cell):
+        row, col = cell
+        if not (0 <= row < self.grid.height and 0 <= col < self.grid.width):
+            return False
+        return self.mask[self.grid.index(row, col)] != 0
+
+    def __iter__(self):
+        for index, value in enumerate(self.mask):
+            if value:
+                yield self.grid.cell(index)
+
+    def __len__(self):
+        return len(self.mask) - self.mask.count(0)
+
+
+class Result:
+
+    def __init__(self, solution, explored, num_explored):
+        # (actions, cells) from the start to the goal, or None
+        self.solution = solution
+        # CellSet of the cells the search reached
+        self.explored = explored
+        self.num_explored = num_explored
+
+
+def _steps(grid):
+    """Index offset of each move code."""
+    stride = grid.stride
+    return {UP: -stride, DOWN: stride, LEFT: -1, RIGHT: 1}
+
+
+def _solution(grid, came_from, jumps=None):
+    """
+    Walks back from the goal to the start, one step against the move
+    recorded for each cell. `jumps` maps the cells where jump point
+    search stopped to the cell it jumped from; the straight runs between
+    them are filled in.
+    """
+    steps = _steps(grid)
+    actions = []
+    cells = []
+    index = grid.goal
+    while index != grid.start:
+        move = came_from[index]
+        step = steps[move]
+        parent = index - step if jumps is None else jumps[index]
+        while index != parent:
+            actions.append(ACTIONS[move])
+            cells.append(grid.cell(index))
+            index -= step
+    actions.reverse()
+    cells.reverse()
+    return actions, cells
+
+
+def _result(grid, came_from, found, num_explored, jumps=None):
+    solution = _solution(grid, came_from, jumps) if found else None
+    return Result(solution, CellSet(grid, came_from), num_explored)
+
+
+def bfs(grid, probe=None, trace=None):
+    """Breadth-first search, testing for the goal as cells are queued."""
+    walls = grid.walls
+    came_from = bytearray(len(walls))
+    moves = list(_steps(grid).items())
+    start, goal = grid.start, grid.goal
+    came_from[start] = START
+
+    num_explored = 0
+    found = start == goal
+    layer = [start]
+    while layer and not found:
+        next_layer = []
+        for index in layer:
+            num_explored += 1
+            if probe is not None:
+                probe.expand(len(layer) + len(next_layer))
+            if trace is not None:
+                trace.append(index)
+            for move, step in moves:
+                neighbour = index + step
+                if walls[neighbour] or came_from[neighbour]:
+                    continue
+                came_from[neighbour] = move
+                if neighbour == goal:
+                    found = True
+                    break
+                next_layer.append(neighbour)
+            if found:
+                break
+        layer = next_layer
+
+    return _result(grid, came_from, found, num_explored)
+
+
+def astar(grid, probe=None, trace=None):
+    """
+    A* with the Manhattan distance to the goal as the heuristic.
+
+    A cell's move is recorded when it is expanded, from the cheapest of
+    its heap entries, so no per-cell cost array is needed: the cost of an
+    entry is its f minus its h.
+    """
+    walls = grid.walls
+    came_from = bytearray(len(walls))
+    moves = list(_steps(grid).items())
+    start, goal = grid.start, grid.goal
+    stride = grid.stride
+    goal_row, goal_col = divmod(goal, stride)
+
+    # (f, h, index, move): among equal f, cells nearer the goal come first
+    h = grid.distance_to_goal(start)
+    heap = [(h, h, start, START)]
+    num_explored = 0
+    found = False
+    while heap:
+        f, h, index, move = heapq.heappop(heap)
+        if came_from[index]:
+            continue
+        came_from[index] = move
+        num_explored += 1
+        if probe is not None:
+            probe.expand(len(heap))
+        if trace is not None:
+            trace.append(index)
+        if index == goal:
+            found = True
+            break
+        cost = f - h + 1
+        for move, step in moves:
+            neighbour = index + step
+            if walls[neighbour] or came_from[neighbour]:
+                continue
+            row, col = divmod(neighbour, stride)
+            h = abs(row - goal_row) + abs(col - goal_col)
+            heapq.heappush(heap, (cost + h, h, neighbour, move))
+
+    return _result(grid, came_from, found, num_explored)
+
+
+def jps(grid, probe=None, trace=None):
+    """
+    Jump point search for four-connected grids.
+
+    Among the many equally short paths through open space, only those
+    that finish each row before turning into a column are considered.
+    A horizontal jump therefore carries on until a vertical jump from one
+    of its cells finds something; a vertical jump only stops at the goal
+    or where a wall beside the cell behind it ends (a forced neighbour).
+    Only the cells where jumps stop go on the heap, and only they get a
+    move recorded, along with the cell each one was jumped to from.
+    """
+    walls = grid.walls
+    stride = grid.stride
+    came_from = bytearray(len(walls))
+    steps = _steps(grid)
+    start, goal = grid.start, grid.goal
+    goal_row, goal_col = divmod(goal, stride)
+    # jump point -> the cell it was jumped to from
+    jumps = {}
+
+    def jump_vertical(index, step):
+        while True:
+            index += step
+            if walls[index]:
+                return None
+            if index == goal:
+                return index
+            # a side cell the cell behind could not have turned into
+            if ((not walls[index - 1] and walls[index - step - 1])
+                    or (not walls[index + 1] and walls[index - step + 1])):
+                return index
+
+    def jump_horizontal(index, step):
+        while True:
+            index += step
+            if walls[index]:
+                return None
+            if index == goal:
+                return index
+            if (jump_vertical(index, -stride) is not None
+                    or jump_vertical(index, stride) is not None):
+                return index
+
+    def directions(index):
+        move = came_from[index]
+        if move == START:
+            return (UP, DOWN, LEFT, RIGHT)
+        if move in (LEFT, RIGHT):
+            # arrived along a row: go on, or turn into either column
+            return (move, UP, DOWN)
+        moves = [move]
+        behind = index - steps[move]
+        if not walls[index - 1] and walls[behind - 1]:
+            moves.append(LEFT)
+        if not walls[index + 1] and walls[behind + 1]:
+            moves.append(RIGHT)
+        return moves
+
+    h = grid.distance_to_goal(start)
+    heap = [(h, h, start, START, start)]
+    num_explored = 0
+    found = False
+    while heap:
+        f, h, index, move, parent = heapq.heappop(heap)
+        if came_from[index]:
+            continue
+        came_from[index] = move
+        jumps[index] = parent
+        num_explored += 1
+        if probe is not None:
+            probe.expand(len(heap))
+        if trace is not None:
+            trace.append(index)
+        if index == goal:
+            found = True
+            break
+        cost = f - h
+        row, col = divmod(index, stride)
+        for move in directions(index):
+            step = steps[move]
+            if walls[index + step]:
+                continue
+            if move in (LEFT, RIGHT):
+                jump = jump_horizontal(index, step)
+            else:
+                jump = jump_vertical(index, step)
+            if jump is None or came_from[jump]:
+                continue
+            jump_row, jump_col = divmod(jump, stride)
+            h = abs(jump_row - goal_row) + abs(jump_col - goal_col)
+            distance = abs(jump_row - row) + abs(jump_col - col)
+            heapq.heappush(heap, (cost + distance + h, h, jump, move, index))
+
+    return _result(grid, came_from, found, num_explored, jumps)
+
+
+def load(filename):
+    """
+    Reads a maze text file into a Grid. Spaces are open cells, "A" is the
+    start, "B" the goal and any other character a wall; lines shorter
+    than the longest are open past their end.
+
+    The file is read twice, a line at a time: once for its size, then to
+    fill in the walls, so memory holds the bitmap but never the text.
+    """
+    height = width = 0
+    with open(filename) as f:
+        for line in f:
+            height += 1
+            width = max(width, len(line.rstrip("\n")))
+
+    grid = Grid(height, width)
+    walls = grid.walls
+    starts = goals = 0
+    with open(filename) as f:
+        for i, line in enumerate(f):
+            line = line.rstrip("\n")
+            base = grid.index(i, 0)
+            # one byte per character, so columns line up with the text
+            cells = line.encode("latin-1", "replace").translate(CELLS)
+            walls[base:base + len(cells)] = cells
+            walls[base + len(cells):base + width] = bytes(width - len(cells))
+            if "A" in line:
+                starts += line.count("A")
+                grid.start = base + line.index("A")
+            if "B" in line:
+                goals += line.count("B")
+                grid.goal = base + line.index("B")
+
+    # Validate start and goal
+    if starts != 1:
+        raise Exception("maze must have exactly one start point")
+    if goals != 1:
+        raise Exception("maze must have exactly one goal")
+    return grid
+
+
+def save(grid, filename):
+    """Writes `grid` as maze text that load reads back, a row at a time."""
+    with open(filename, "w") as f:
+        for i in range(grid.height):
+            base = grid.index(i, 0)
+            line = bytearray(grid.walls[base:base + grid.width].translate(TEXT))
+            for index, mark in ((grid.start, b"A"), (grid.goal, b"B")):
+                if base <= index < base + grid.width:
+                    line[index - base] = mark[0]
+            f.write(line.decode("ascii"))
+            f.write("\n")
+
+
+ALGORITHMS = {"bfs": bfs, "astar": astar, "jps": jps}
+
+
+def solve(grid, algorithm="astar", probe=None, trace=None):
+    """
+    Runs one of the searches above. If `trace` is a list or array, the
+    index of every expanded cell is appended to it in order.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm: {algorithm}")
+    return ALGORITHMS[algorithm](grid, probe, trace)
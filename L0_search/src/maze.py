@@ -1,10 +1,22 @@
+import heapq
+import itertools
 import sys
+from array import array
+
+import grid
+
+
+class NoSolution(Exception):
+    """Raised by Maze.solve and Maze.solve_grid when the goal is unreachable."""
+
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        # number of steps from the start
+        self.cost = cost
 
 
 class StackFrontier():
@@ -20,6 +32,9 @@ class StackFrontier():
     def empty(self):
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
@@ -39,46 +54,68 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class PriorityFrontier():
+    """
+    Removes the node with the lowest priority(node) first, oldest first
+    among equals. Adding a state that is already queued keeps whichever
+    entry has the lower priority.
+    """
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.heap = []
+        # state -> live heap entry [priority, sequence, node, alive]
+        self.entries = {}
+        self.sequence = itertools.count()
+
+    def add(self, node):
+        priority = self.priority(node)
+        entry = self.entries.get(node.state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return
+            entry[3] = False
+        entry = [priority, next(self.sequence), node, True]
+        self.entries[node.state] = entry
+        heapq.heappush(self.heap, entry)
+
+    def contains_state(self, state):
+        return state in self.entries
+
+    def empty(self):
+        return len(self.entries) == 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            _, _, node, alive = heapq.heappop(self.heap)
+            if alive:
+                break
+        del self.entries[node.state]
+        return node
+
 class Maze():
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
-
-        # Validate start and goal
-        if contents.count("A") != 1:
-            raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
-            raise Exception("maze must have exactly one goal")
-
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Read file into a wall bitmap, a line at a time
+        self.grid = grid.load(filename)
+        self.height = self.grid.height
+        self.width = self.grid.width
+        self.start = self.grid.cell(self.grid.start)
+        self.goal = self.grid.cell(self.grid.goal)
+
+        # Keep track of walls: walls[i][j] is true for a wall
+        self.walls = self.grid.rows()
 
         self.solution = None
+        # expansion order of the last solve_grid(record=True)
+        self.order = None
 
 
     def print(self):
@@ -116,15 +153,40 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def distance_to_goal(self, state):
+        """Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def make_frontier(self, algorithm):
+        if algorithm == "dfs":
+            return StackFrontier()
+        if algorithm == "bfs":
+            return QueueFrontier()
+        if algorithm == "gbfs":
+            return PriorityFrontier(
+                lambda node: self.distance_to_goal(node.state))
+        if algorithm == "astar":
+            return PriorityFrontier(
+                lambda node: node.cost + self.distance_to_goal(node.state))
+        raise ValueError(f"unknown algorithm: {algorithm}")
+
+
+    def solve(self, algorithm="dfs", probe=None):
+        """
+        Finds a solution to maze, if one exists, by depth-first ("dfs"),
+        breadth-first ("bfs"), greedy best-first ("gbfs") or A* ("astar")
+        search. If `probe` is an instrument.Probe, every expansion is
+        reported to it.
+        """
 
         # Keep track of number of states explored
         self.num_explored = 0
+        self.order = None
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        frontier = self.make_frontier(algorithm)
         frontier.add(start)
 
         # Initialize an empty explored set
@@ -135,11 +197,13 @@ class Maze():
 
             # If nothing left in frontier, then no path
             if frontier.empty():
-                raise Exception("no solution")
+                raise NoSolution("no solution")
 
             # Choose a node from the frontier
             node = frontier.remove()
             self.num_explored += 1
+            if probe is not None:
+                probe.expand(len(frontier))
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
@@ -159,71 +223,75 @@ class Maze():
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
-
-
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+                if state in self.explored:
+                    continue
+                # A* may still find a cheaper way to a queued state
+                if frontier.contains_state(state) and algorithm != "astar":
+                    continue
+                child = Node(state=state, parent=node, action=action,
+                             cost=node.cost + 1)
+                frontier.add(child)
+
+
+    def solve_grid(self, algorithm="astar", probe=None, record=False):
+        """
+        Finds a solution to maze like solve, but with the array-backed
+        breadth-first ("bfs"), A* ("astar") or jump point ("jps") search
+        in grid.py, which scales to mazes with millions of cells. With
+        record=True the order cells were expanded in is kept for
+        output_frames.
+        """
+        self.order = array("i") if record else None
+        result = grid.solve(self.grid, algorithm, probe, self.order)
+        self.num_explored = result.num_explored
+        self.explored = result.explored
+        if result.solution is None:
+            raise NoSolution("no solution")
+        self.solution = result.solution
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        import render
+
+        solution = explored = None
+        if self.solution is not None:
+            if show_solution:
+                solution = render.cell_mask(self.grid, self.solution[1])
+            if show_explored:
+                explored = render.cell_mask(self.grid, self.explored)
+        cells = render.colors(self.grid, solution, explored)
+        render.image(cells, cell_size, cell_border).save(filename)
+
+
+    def output_frames(self, filename, frames=50, cell_size=50,
+                      cell_border=2, duration=100):
+        """
+        Saves the search recorded by solve_grid(record=True) as `frames`
+        pictures of the explored cells growing, ending with the solution:
+        numbered files if `filename` has a "{}" field for the frame
+        number, otherwise one animated GIF or PNG.
+        """
+        import render
+
+        if self.order is None:
+            raise Exception("solve with solve_grid(record=True) first")
+        solution = render.cell_mask(self.grid, self.solution[1])
+        pictures = render.frames(self.grid, self.order, solution, frames,
+                                 cell_size=cell_size, cell_border=cell_border)
+        render.save_frames(pictures, filename, duration)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python maze.py maze.txt")
+
+    m = Maze(sys.argv[1])
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve()
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
@@ -0,0 +1,121 @@
+"""
+Maze pictures built with NumPy instead of one rectangle per cell.
+
+Every cell gets a colour index from a few boolean masks (walls, explored,
+solution, start, goal), the index array is blown up to pixels with
+np.repeat, the gaps between cells are blacked out a whole row or column
+of pixels at a time, and the result is saved as a palette image, so the
+picture costs one byte per pixel however big the maze is.
+"""
+
+import numpy as np
+from PIL import Image
+
+# colour indices
+BORDER, WALL, START, GOAL, SOLUTION, EXPLORED, EMPTY = range(7)
+PALETTE = [
+    (0, 0, 0),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+    (237, 240, 252),
+]
+
+# largest picture, in pixels per side, before cells are drawn smaller
+MAX_SIDE = 8000
+
+
+def cell_mask(grid, cells):
+    """
+    Boolean height x width mask of `cells`: a grid.CellSet, or any
+    iterable of (row, col) pairs.
+    """
+    mask = getattr(cells, "mask", None)
+    if mask is not None:
+        padded = np.frombuffer(mask, dtype=np.uint8)
+        padded = padded.reshape(grid.height + 2, grid.stride)
+        return padded[1:-1, 1:-1] != 0
+    result = np.zeros((grid.height, grid.width), dtype=bool)
+    cells = np.array(list(cells), dtype=np.intp).reshape(-1, 2)
+    result[cells[:, 0], cells[:, 1]] = True
+    return result
+
+
+def colors(grid, solution=None, explored=None):
+    """
+    Colour index of every cell. `solution` and `explored` are boolean
+    masks, or None to leave them out.
+    """
+    walls = np.frombuffer(grid.walls, dtype=np.uint8)
+    walls = walls.reshape(grid.height + 2, grid.stride)[1:-1, 1:-1] != 0
+
+    # later layers win, as in the order of checks in Maze.output_image
+    cells = np.full((grid.height, grid.width), EMPTY, dtype=np.uint8)
+    if explored is not None:
+        cells[explored] = EXPLORED
+    if solution is not None:
+        cells[solution] = SOLUTION
+    cells[grid.cell(grid.goal)] = GOAL
+    cells[grid.cell(grid.start)] = START
+    cells[walls] = WALL
+    return cells
+
+
+def image(cells, cell_size=50, cell_border=2):
+    """
+    Palette image of colour indices `cells`, each cell drawn as a square
+    of `cell_size` pixels with `cell_border` pixels of black around it.
+    Cells are drawn smaller, and borders dropped once they would cover
+    most of a cell, if the picture would be more than MAX_SIDE pixels.
+    """
+    height, width = cells.shape
+    cell_size = max(1, min(cell_size, MAX_SIDE // max(height, width)))
+    if cell_border * 4 > cell_size:
+        cell_border = 0
+
+    pixels = np.repeat(np.repeat(cells, cell_size, axis=0), cell_size, axis=1)
+    if cell_border:
+        offset = np.arange(cell_size)
+        # the same pixels a rectangle from +border to size-border covers
+        inside = (offset >= cell_border) & (offset <= cell_size - cell_border)
+        pixels[~np.tile(inside, height), :] = BORDER
+        pixels[:, ~np.tile(inside, width)] = BORDER
+
+    picture = Image.fromarray(pixels, mode="P")
+    picture.putpalette([c for color in PALETTE for c in color])
+    return picture
+
+
+def frames(grid, order, solution=None, count=50, **options):
+    """
+    Yields `count` pictures of a search in progress: the cells expanded
+    so far, in the order given by `order` (padded grid indices, as
+    recorded by grid.solve's trace), then the solution on the last one.
+    """
+    order = np.asarray(order, dtype=np.intp)
+    explored = np.zeros(len(grid.walls), dtype=bool)
+    view = explored.reshape(grid.height + 2, grid.stride)[1:-1, 1:-1]
+    done = 0
+    for frame in range(1, count + 1):
+        upto = len(order) * frame // count
+        explored[order[done:upto]] = True
+        done = upto
+        last = solution if frame == count else None
+        yield image(colors(grid, last, view), **options)
+
+
+def save_frames(pictures, filename, duration=100):
+    """
+    Saves a sequence of pictures: numbered files if `filename` has a
+    "{}" field for the frame number (e.g. "frame{:04}.png"), otherwise
+    one animated GIF or PNG.
+    """
+    if "{" in filename:
+        for number, picture in enumerate(pictures):
+            picture.save(filename.format(number))
+        return
+    first, *rest = pictures
+    first.save(filename, save_all=True, append_images=rest,
+               duration=duration, loop=0)
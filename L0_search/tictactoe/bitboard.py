@@ -0,0 +1,214 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A drop-in alternative to tictactoe.py: the same functions, taking and
+returning the same nested-list boards, but worked out on two 9-bit masks,
+one per player, where cell (i, j) is bit 3 * i + j. Wins are a handful of
+mask tests against the 8 precomputed lines, and minimax values are
+memoized in a transposition table keyed by the board's canonical form
+under the 8 rotations and reflections of the square, so the whole game
+tree is only ever solved once.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# the 8 winning lines as masks
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# where each cell goes under each symmetry of the square
+SYMMETRIES = []
+for _turns in range(4):
+    for _mirror in (False, True):
+        _cells = []
+        for _cell in range(9):
+            _i, _j = divmod(_cell, 3)
+            if _mirror:
+                _j = 2 - _j
+            for _ in range(_turns):
+                _i, _j = _j, 2 - _i
+            _cells.append(3 * _i + _j)
+        SYMMETRIES.append(_cells)
+
+# TRANSFORMS[s][mask] is `mask` with symmetry s applied
+TRANSFORMS = [
+    [sum(1 << cells[cell] for cell in range(9) if mask >> cell & 1)
+     for mask in range(1 << 9)]
+    for cells in SYMMETRIES
+]
+
+# canonical board -> minimax value, with X maximizing
+TABLE = {}
+
+
+def from_board(board):
+    """Returns the (x, o) masks of a nested-list board."""
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """Returns the nested-list board of masks x and o."""
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+
+def canonical(x, o):
+    """One key shared by a board and all its rotations and reflections."""
+    return min(table[x] | table[o] << 9 for table in TRANSFORMS)
+
+
+def mask_player(x, o):
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def mask_winner(x, o):
+    for line in WIN_MASKS:
+        if x & line == line:
+            return X
+        if o & line == line:
+            return O
+    return None
+
+
+def value(x, o):
+    """Minimax value of the board: 1 if X wins, -1 if O wins, 0 for a tie."""
+    key = canonical(x, o)
+    known = TABLE.get(key)
+    if known is not None:
+        return known
+
+    win = mask_winner(x, o)
+    if win is not None:
+        v = 1 if win == X else -1
+    elif x | o == FULL:
+        v = 0
+    elif mask_player(x, o) == X:
+        v = -1
+        free = FULL & ~(x | o)
+        while free:
+            bit = free & -free
+            free ^= bit
+            v = max(v, value(x | bit, o))
+            if v == 1:
+                break
+    else:
+        v = 1
+        free = FULL & ~(x | o)
+        while free:
+            bit = free & -free
+            free ^= bit
+            v = min(v, value(x, o | bit))
+            if v == -1:
+                break
+    TABLE[key] = v
+    return v
+
+
+def best_move(x, o):
+    """Returns the optimal cell (0-8) for the player to move, or None."""
+    if mask_winner(x, o) is not None or x | o == FULL:
+        return None
+    turn = mask_player(x, o)
+    best = None
+    best_value = None
+    for cell in range(9):
+        bit = 1 << cell
+        if (x | o) & bit:
+            continue
+        if turn == X:
+            v = value(x | bit, o)
+            if best_value is None or v > best_value:
+                best, best_value = cell, v
+        else:
+            v = value(x, o | bit)
+            if best_value is None or v < best_value:
+                best, best_value = cell, v
+    return best
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY, EMPTY, EMPTY], [EMPTY, EMPTY, EMPTY], [EMPTY, EMPTY, EMPTY]]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return mask_player(*from_board(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = from_board(board)
+    taken = x | o
+    return {divmod(cell, 3) for cell in range(9) if not taken >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or board[i][j] is not EMPTY:
+        raise Exception("Invalid action")
+    new_board = [list(row) for row in board]
+    new_board[i][j] = player(board)
+    return new_board
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return mask_winner(*from_board(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = from_board(board)
+    return mask_winner(x, o) is not None or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    win = winner(board)
+    if win == X:
+        return 1
+    elif win == O:
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    or None if the game is over.
+    """
+    cell = best_move(*from_board(board))
+    return None if cell is None else divmod(cell, 3)
@@ -0,0 +1,116 @@
+"""
+Perfect-play book for tic-tac-toe.
+
+Every reachable position is solved once, offline, and written as one
+byte per board to a file of 3 ** 9 entries, indexed by reading the board
+as a base-3 number (EMPTY 0, X 1, O 2, cell (0, 0) the lowest digit).
+Each byte holds the optimal cell to play (0-8, 15 once the game is over)
+in its low four bits and the outcome under perfect play (0 tie, 1 X wins,
+2 O wins) in the next two; positions that cannot arise are UNREACHABLE.
+Looking a move up is a sum over nine cells and one index.
+
+    python book.py            # writes book.bin next to this file
+"""
+
+import os
+import sys
+
+import bitboard
+from tictactoe import EMPTY, O, X
+
+MAGIC = b"TTTB"
+UNREACHABLE = 0xFF
+NO_MOVE = 0x0F
+OUTCOMES = (None, X, O)
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+SIZE = 3 ** 9
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+
+def key(board):
+    """Base-3 index of a nested-list board."""
+    index = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            index = index * 3 + DIGITS[cell]
+    return index
+
+
+def solve():
+    """Returns the book as a bytearray of SIZE entries."""
+    table = bytearray([UNREACHABLE]) * SIZE
+    powers = [3 ** cell for cell in range(9)]
+
+    def visit(x, o, index):
+        if table[index] != UNREACHABLE:
+            return
+        value = bitboard.value(x, o)
+        outcome = 1 if value == 1 else 2 if value == -1 else 0
+        move = bitboard.best_move(x, o)
+        table[index] = outcome << 4 | (NO_MOVE if move is None else move)
+        if move is None:
+            return
+        turn_x = bitboard.mask_player(x, o) == X
+        for cell in range(9):
+            bit = 1 << cell
+            if (x | o) & bit:
+                continue
+            if turn_x:
+                visit(x | bit, o, index + powers[cell])
+            else:
+                visit(x, o | bit, index + 2 * powers[cell])
+
+    visit(0, 0, 0)
+    return table
+
+
+def write(path=PATH):
+    table = solve()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+    return table
+
+
+class Book:
+
+    def __init__(self, table):
+        if len(table) != SIZE:
+            raise ValueError("book has the wrong number of entries")
+        self.table = table
+
+    @classmethod
+    def load(cls, path=PATH):
+        """Reads a book written by `write`; raises OSError if missing."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a tic-tac-toe book")
+        return cls(data[len(MAGIC):])
+
+    def entry(self, board):
+        entry = self.table[key(board)]
+        if entry == UNREACHABLE:
+            raise ValueError("position cannot arise in a game")
+        return entry
+
+    def move(self, board):
+        """Optimal action (i, j) on the board, or None if the game is over."""
+        cell = self.entry(board) & NO_MOVE
+        return None if cell == NO_MOVE else divmod(cell, 3)
+
+    def outcome(self, board):
+        """Winner under perfect play from here: X, O, or None for a tie."""
+        return OUTCOMES[self.entry(board) >> 4]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else PATH
+    table = write(path)
+    reachable = sum(entry != UNREACHABLE for entry in table)
+    print(f"{reachable} positions written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+m,n,k games: tic-tac-toe on any board, k in a row to win.
+
+Board keeps the cells in a bytearray and, for every window of k cells
+that makes a line, how many of each player's stones are in it. Playing or
+taking back a stone only touches the windows through that cell, which
+gives both win detection around the last move and a running heuristic
+score (open windows weighted by how full they are) for free.
+
+best_move searches with depth-limited alpha-beta (negamax), ordering
+moves by how much they gain, caching results in a transposition table
+keyed by a Zobrist hash of the position, and deepening one ply at a time
+until the deadline; it returns the best move of the deepest finished pass.
+On a 3x3 board with k = 3 it plays perfectly.
+
+    board = Board(15, 15, 5)
+    board.play(board.cell(7, 7))
+    move = best_move(board, time.monotonic() + 1.0)
+"""
+
+import random
+import time
+
+from tictactoe import EMPTY, O, X
+
+# cell contents
+NOBODY, FIRST, SECOND = 0, 1, 2
+SYMBOLS = {NOBODY: EMPTY, FIRST: X, SECOND: O}
+
+# how far from an existing stone a move is still considered
+REACH = 2
+
+# transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Zobrist keys per board size, so equal positions always hash alike
+_ZOBRIST = {}
+
+# windows and the windows through each cell, per (rows, cols, k)
+_LINES = {}
+
+
+def _lines(rows, cols, k):
+    shape = (rows, cols, k)
+    if shape not in _LINES:
+        windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        windows.append([(i + di * s) * cols + j + dj * s
+                                        for s in range(k)])
+        through = [[] for _ in range(rows * cols)]
+        for w, window in enumerate(windows):
+            for cell in window:
+                through[cell].append(w)
+        near = []
+        for i in range(rows):
+            for j in range(cols):
+                near.append([a * cols + b
+                             for a in range(max(0, i - REACH),
+                                            min(rows, i + REACH + 1))
+                             for b in range(max(0, j - REACH),
+                                            min(cols, j + REACH + 1))
+                             if (a, b) != (i, j)])
+        _LINES[shape] = (windows, through, near)
+    return _LINES[shape]
+
+
+def _zobrist(size):
+    if size not in _ZOBRIST:
+        rng = random.Random(size)
+        _ZOBRIST[size] = [(0, rng.getrandbits(64), rng.getrandbits(64))
+                          for _ in range(size)]
+    return _ZOBRIST[size]
+
+
+class Board:
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if k > max(rows, cols):
+            raise ValueError("k is longer than the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = bytearray(rows * cols)
+        self.moves = []
+        self.windows, self.through, self.near = _lines(rows, cols, k)
+        self.keys = _zobrist(rows * cols)
+        self.hash = 0
+        # stones of each player in every window, indexed by player
+        self.counts = [None,
+                       [0] * len(self.windows), [0] * len(self.windows)]
+        # occupied cells within REACH of each cell
+        self.nearby = [0] * (rows * cols)
+        # open-window score from the first player's point of view
+        self.score = 0
+        # player who has k in a row, if any
+        self.won = NOBODY
+        # weight of an open window holding c stones of one player
+        self.weights = [0] + [4 ** c for c in range(1, k)] + [0]
+        # proven wins score win - plies to the win, which stays above any
+        # open-window score however many windows are nearly full
+        self.win = (len(self.windows) * self.weights[k - 1]
+                    + len(self.cells) + 1)
+        # hash -> (depth, value, flag, move), kept between searches
+        self.table = {}
+
+    @classmethod
+    def from_rows(cls, rows, k=3):
+        """Board from a tictactoe-style nested list of X, O and EMPTY."""
+        board = cls(len(rows), len(rows[0]), k)
+        xs = [(i, j) for i, row in enumerate(rows)
+              for j, cell in enumerate(row) if cell == X]
+        os = [(i, j) for i, row in enumerate(rows)
+              for j, cell in enumerate(row) if cell == O]
+        if not 0 <= len(xs) - len(os) <= 1:
+            raise ValueError("X moves first and players alternate")
+        for n in range(len(xs) + len(os)):
+            board.play(board.cell(*(xs if n % 2 == 0 else os)[n // 2]))
+        return board
+
+    def to_rows(self):
+        return [[SYMBOLS[self.cells[i * self.cols + j]]
+                 for j in range(self.cols)] for i in range(self.rows)]
+
+    def cell(self, i, j):
+        return i * self.cols + j
+
+    def action(self, cell):
+        return divmod(cell, self.cols)
+
+    def turn(self):
+        """Player to move next: FIRST or SECOND."""
+        return FIRST if len(self.moves) % 2 == 0 else SECOND
+
+    def full(self):
+        return len(self.moves) == len(self.cells)
+
+    def terminal(self):
+        return self.won != NOBODY or self.full()
+
+    def _window_score(self, mine, theirs):
+        if theirs == 0:
+            return self.weights[mine]
+        if mine == 0:
+            return -self.weights[theirs]
+        return 0
+
+    def play(self, cell):
+        if self.cells[cell] != NOBODY or self.won != NOBODY:
+            raise ValueError("Invalid action")
+        player = self.turn()
+        self.cells[cell] = player
+        self.moves.append(cell)
+        self.hash ^= self.keys[cell][player]
+        first, second = self.counts[FIRST], self.counts[SECOND]
+        mine = self.counts[player]
+        for w in self.through[cell]:
+            self.score -= self._window_score(first[w], second[w])
+            mine[w] += 1
+            self.score += self._window_score(first[w], second[w])
+            if mine[w] == self.k:
+                self.won = player
+        for other in self.near[cell]:
+            self.nearby[other] += 1
+
+    def undo(self):
+        cell = self.moves.pop()
+        player = self.cells[cell]
+        self.cells[cell] = NOBODY
+        self.hash ^= self.keys[cell][player]
+        first, second = self.counts[FIRST], self.counts[SECOND]
+        mine = self.counts[player]
+        for w in self.through[cell]:
+            self.score -= self._window_score(first[w], second[w])
+            mine[w] -= 1
+            self.score += self._window_score(first[w], second[w])
+        # only the last move can have made a line
+        self.won = NOBODY
+        for other in self.near[cell]:
+            self.nearby[other] -= 1
+
+    def candidates(self):
+        """
+        Empty cells worth trying: all of them on small boards, otherwise
+        those within REACH of a stone (the centre on an empty board).
+        """
+        cells = self.cells
+        if len(cells) <= 16:
+            return [c for c in range(len(cells)) if cells[c] == NOBODY]
+        if not self.moves:
+            return [self.cell(self.rows // 2, self.cols // 2)]
+        nearby = self.nearby
+        return [c for c in range(len(cells))
+                if cells[c] == NOBODY and nearby[c]]
+
+    def gain(self, cell):
+        """How much playing `cell` would change the mover's score."""
+        player = self.turn()
+        first, second = self.counts[FIRST], self.counts[SECOND]
+        change = 0
+        for w in self.through[cell]:
+            before = self._window_score(first[w], second[w])
+            if player == FIRST:
+                after = self._window_score(first[w] + 1, second[w])
+            else:
+                after = self._window_score(first[w], second[w] + 1)
+            change += after - before
+        # blocking the opponent's fullest windows counts as much as
+        # filling one's own, so score the swing from the mover's side
+        return change if player == FIRST else -change
+
+
+class Timeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+class Search:
+
+    def __init__(self, board, deadline=None):
+        self.board = board
+        self.deadline = deadline
+        self.nodes = 0
+        self.win = board.win
+        # values beyond this are wins or losses, win - plies from the root
+        self.proven = self.win - len(board.cells)
+
+    def to_table(self, value, ply):
+        """
+        Win and loss values count plies from the search root; the table
+        outlives the search, so store them counted from the node instead.
+        """
+        if value > self.proven:
+            return value + ply
+        if value < -self.proven:
+            return value - ply
+        return value
+
+    def from_table(self, value, ply):
+        if value > self.proven:
+            return value - ply
+        if value < -self.proven:
+            return value + ply
+        return value
+
+    def evaluate(self):
+        board = self.board
+        return board.score if board.turn() == FIRST else -board.score
+
+    def ordered(self, first=None):
+        board = self.board
+        moves = sorted(board.candidates(), key=board.gain, reverse=True)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, depth, alpha, beta, ply):
+        """Value of the position for the player to move."""
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes % 512 == 0
+                and time.monotonic() > self.deadline):
+            raise Timeout
+        board = self.board
+        if board.won != NOBODY:
+            # the player who just moved made a line
+            return -(self.win - ply)
+        if board.full():
+            return 0
+        if depth == 0:
+            return self.evaluate()
+
+        alpha_start = alpha
+        entry = board.table.get(board.hash)
+        best_move = None
+        if entry is not None:
+            entry_depth, value, flag, best_move = entry
+            value = self.from_table(value, ply)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best = -self.win - 1
+        for cell in self.ordered(best_move):
+            board.play(cell)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if value > best:
+                best, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best <= alpha_start:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        board.table[board.hash] = (depth, self.to_table(best, ply), flag,
+                                   best_move)
+        return best
+
+    def root(self, depth, first=None):
+        """Best move and its value, searching `depth` plies."""
+        board = self.board
+        alpha, beta = -self.win - 1, self.win + 1
+        best_move, best = None, -self.win - 1
+        for cell in self.ordered(first):
+            board.play(cell)
+            try:
+                value = -self.negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                board.undo()
+            if value > best:
+                best, best_move = value, cell
+            alpha = max(alpha, value)
+        return best_move, best
+
+
+def best_move(board, deadline=None, max_depth=None, stats=None):
+    """
+    Returns the (i, j) action for the player to move on `board`, or None
+    if the game is over.
+
+    Searches one ply deeper at a time until `deadline` (a time.monotonic()
+    timestamp) passes, a win or loss is proven, or `max_depth` plies have
+    been searched, and answers with the deepest finished pass. If `stats`
+    is a dict, the nodes searched and depth finished are stored in it.
+    """
+    if board.terminal():
+        return None
+    search = Search(board, deadline)
+    remaining = len(board.cells) - len(board.moves)
+    max_depth = remaining if max_depth is None else min(max_depth, remaining)
+
+    moves = search.ordered()
+    move = moves[0]
+    finished = 0
+    # with a single candidate there is nothing to search
+    for depth in range(1, max_depth + 1 if len(moves) > 1 else 1):
+        try:
+            move, value = search.root(depth, move)
+        except Timeout:
+            break
+        finished = depth
+        if abs(value) >= board.win - remaining:
+            break
+
+    if stats is not None:
+        stats["nodes"] = search.nodes
+        stats["depth"] = finished
+    return board.action(move)
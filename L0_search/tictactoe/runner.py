@@ -3,9 +3,20 @@ import sys
 import time
 
 import tictactoe as ttt
+from book import Book
+from worker import Worker
+
+# perfect moves looked up from the precomputed book (python book.py),
+# or searched for if it has not been built
+try:
+    book = Book.load()
+    choose_move = book.move
+except (OSError, ValueError):
+    choose_move = ttt.minimax
 
 pygame.init()
 size = width, height = 600, 400
+FPS = 30
 
 # Colors
 black = (0, 0, 0)
@@ -19,12 +30,16 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# computes the AI's moves in the background while the board is drawn
+worker = Worker()
+clock = pygame.time.Clock()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -102,7 +117,7 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = f"Computer thinking... {worker.elapsed():.1f}s"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
@@ -110,13 +125,10 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if worker.done():
+                board = ttt.result(board, worker.result())
+            elif not worker.thinking():
+                worker.submit(choose_move, board)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +153,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    worker.cancel()
 
     pygame.display.flip()
+    clock.tick(FPS)
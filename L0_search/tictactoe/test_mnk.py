@@ -0,0 +1,29 @@
+import mnk
+
+
+def root_value(board):
+    search = mnk.Search(board)
+    return search.root(len(board.cells) - len(board.moves))[1]
+
+
+def test_table_reuse_keeps_win_distances():
+    board = mnk.Board(3, 4, 3)
+    while not board.terminal():
+        fresh = mnk.Board(3, 4, 3)
+        for cell in board.moves:
+            fresh.play(cell)
+        assert root_value(board) == root_value(fresh)
+        board.play(board.cell(*mnk.best_move(board)))
+
+
+def test_heuristic_stays_below_win_scores():
+    # two nearly full rows of twelve: every score here is heuristic
+    board = mnk.Board(2, 12, 12)
+    for j in range(10):
+        board.play(board.cell(0, j))
+        board.play(board.cell(1, j))
+    board.play(board.cell(0, 10))
+    search = mnk.Search(board)
+    move, value = search.root(1)
+    assert move == board.cell(0, 11)
+    assert abs(value) < search.proven
@@ -1,5 +1,36 @@
 from tictactoe import *
 
+
+def plain_minimax(board, stats):
+    """
+    Minimax without pruning, as the search used to be, counting the
+    boards it evaluates in stats["nodes"].
+    """
+    stats["nodes"] = 0
+
+    def value(board):
+        stats["nodes"] += 1
+        if terminal(board):
+            return utility(board)
+        values = [value(result(board, action)) for action in actions(board)]
+        return max(values) if player(board) == X else min(values)
+
+    best = max if player(board) == X else min
+    return best(actions(board), key=lambda action: value(result(board, action)))
+
+
+def node_report(boards):
+    """Boards evaluated by plain minimax and by alpha-beta, per position."""
+    print(f"{'position':<32} {'plain':>8} {'alpha-beta':>11} {'saved':>7}")
+    for name, board in boards:
+        plain, pruned = {}, {}
+        plain_minimax(board, plain)
+        minimax(board, pruned)
+        saved = 1 - pruned["nodes"] / plain["nodes"]
+        print(f"{name:<32} {plain['nodes']:>8} {pruned['nodes']:>11} "
+              f"{saved:>7.1%}")
+
+
 def main():
     board = [['O', None, 'X'], [None, 'O', 'O'], ['X', None, 'X']]
     print(player(board))
@@ -7,6 +38,13 @@ def main():
         print(action)
         print(utility(result(board, action)))
     print('best move is: ', minimax(board))
+
+    node_report([
+        ("empty board", initial_state()),
+        ("X in a corner", result(initial_state(), (0, 0))),
+        ("X center, O edge", result(result(initial_state(), (1, 1)), (0, 1))),
+        ("example above", board),
+    ])
     return
 if __name__=="__main__":
-    main()
\ No newline at end of file
+    main()
@@ -131,45 +131,95 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+# center first, then corners, then edges: the cells on the most lines
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def ordered_actions(board, first=None):
+    """
+    Returns the actions available on the board, best-looking first:
+    `first` if it is one of them, then in MOVE_ORDER.
     """
-    Returns the optimal action for the current player on the board.
+    moves = [action for action in MOVE_ORDER
+             if board[action[0]][action[1]] is EMPTY]
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+def minimax(board, stats=None):
     """
+    Returns the optimal action for the current player on the board,
+    or None if the game is over.
 
-    def max_value(board, ab_thresh=None):
+    Searches with alpha-beta pruning, trying the most promising moves
+    first, and deepens one ply at a time: each pass tries the previous
+    pass's best move first, and a pass that proves a win or a loss
+    ends the search early. If `stats` is a dict, the number of boards
+    evaluated is stored in stats["nodes"] and the depth reached in
+    stats["depth"].
+    """
+    if terminal(board):
+        return None
+
+    nodes = 0
+
+    def max_value(board, alpha, beta, depth):
+        nonlocal nodes
+        nodes += 1
         if terminal(board):
             return utility(board)
+        # out of depth: call it a tie for now
+        if depth == 0:
+            return 0
         v = -math.inf
-        for action in actions(board):
-            v = max(v, min_value(result(board, action), ab_thresh=None))
-            if (ab_thresh is not None) and (v > ab_thresh):
+        for action in ordered_actions(board):
+            v = max(v, min_value(result(board, action), alpha, beta, depth - 1))
+            if v >= beta:
                 return v
-                
+            alpha = max(alpha, v)
         return v
 
-    def min_value(board, ab_thresh=None):
+    def min_value(board, alpha, beta, depth):
+        nonlocal nodes
+        nodes += 1
         if terminal(board):
             return utility(board)
+        if depth == 0:
+            return 0
         v = math.inf
-        for action in actions(board):
-            v = min(v, max_value(result(board, action), ab_thresh=None))
-            if (ab_thresh is not None) and (v < ab_thresh):
+        for action in ordered_actions(board):
+            v = min(v, max_value(result(board, action), alpha, beta, depth - 1))
+            if v <= alpha:
                 return v
+            beta = min(beta, v)
         return v
-    action_rewards={}
-    if player(board) == X:
-        for action in actions(board):
-
-            reward = min_value(result(board, action))
-            action_rewards[action] = reward
-            best_action = max(action_rewards.items(), key=lambda x: x[1])
-            best_action = best_action[0]
-    else:
-        for action in actions(board):
-            reward = max_value(result(board, action))
-            action_rewards[action] = reward
-            best_action = min(action_rewards.items(), key=lambda x: x[1])
-            best_action = best_action[0]
 
+    maximizing = player(board) == X
+    best_action = None
+    remaining = len(actions(board))
+    for depth in range(1, remaining + 1):
+        alpha, beta = -math.inf, math.inf
+        best_value = None
+        for action in ordered_actions(board, best_action):
+            if maximizing:
+                v = min_value(result(board, action), alpha, beta, depth - 1)
+                if best_value is None or v > best_value:
+                    best_value, pass_best = v, action
+                alpha = max(alpha, v)
+            else:
+                v = max_value(result(board, action), alpha, beta, depth - 1)
+                if best_value is None or v < best_value:
+                    best_value, pass_best = v, action
+                beta = min(beta, v)
+        best_action = pass_best
+        # depth cut-offs only ever score 0, so a win or loss is certain
+        if best_value != 0:
+            break
+
+    if stats is not None:
+        stats["nodes"] = nodes
+        stats["depth"] = depth
     return best_action
-
@@ -0,0 +1,67 @@
+"""
+Background AI calls for the tic-tac-toe and minesweeper pygame runners.
+
+A Worker runs the functions given to it one at a time, in order, on a
+single background thread, so the render loop keeps drawing and handling
+events while the AI thinks. The loop polls it once per frame:
+
+    worker.submit(ttt.minimax, board)
+    ...
+    if worker.done():
+        move = worker.result()
+
+cancel() drops everything submitted so far, e.g. when the game is reset:
+jobs that have not started are never run, and the result of the one
+already running is thrown away when it finishes (Python threads cannot
+be interrupted, so it runs to the end on its own copy of the game).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Worker:
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = []
+        self.started = None
+
+    def submit(self, function, *args):
+        """Queues function(*args); result() returns the latest one's value."""
+        if not self.thinking():
+            self.started = time.monotonic()
+        self.futures.append(self.executor.submit(function, *args))
+
+    def thinking(self):
+        """True while a submitted call has not finished."""
+        return any(not future.done() for future in self.futures)
+
+    def elapsed(self):
+        """Seconds since the worker last went from idle to thinking."""
+        return 0.0 if self.started is None else time.monotonic() - self.started
+
+    def done(self):
+        """True once every submitted call has finished."""
+        return bool(self.futures) and not self.thinking()
+
+    def result(self):
+        """
+        The value of the last call submitted, re-raising its exception,
+        and forgets all calls so far.
+        """
+        futures, self.futures = self.futures, []
+        for future in futures[:-1]:
+            # surface errors from earlier calls too
+            future.result()
+        return futures[-1].result()
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        self.started = None
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
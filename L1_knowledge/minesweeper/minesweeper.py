@@ -204,8 +204,6 @@ class MinesweeperAI():
         # remove that number from the count
         updated_count = count-num_known_mines_surrounding
         surrounding_cells = surrounding_cells - self.safes
-        if (2,7) in surrounding_cells:
-            print('bro')
         
         return surrounding_cells, updated_count
 
@@ -304,7 +302,7 @@ class MinesweeperAI():
         possible_moves = self.safes - self.moves_made
         if len(possible_moves)==0:
             return None
-        move = random.sample(possible_moves, 1)
+        move = random.sample(sorted(possible_moves), 1)
         return move[0]
 
 
@@ -321,6 +319,6 @@ class MinesweeperAI():
         if len(possible_moves)==0:
             return None
 
-        move = random.sample(possible_moves, 1)
+        move = random.sample(sorted(possible_moves), 1)
         return move[0]
 
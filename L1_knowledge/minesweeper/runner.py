@@ -1,12 +1,19 @@
+import os
 import pygame
 import sys
 import time
 
+# the background worker is shared with the tic-tac-toe runner
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "L0_search", "tictactoe"))
+
 from minesweeper import Minesweeper, MinesweeperAI
+from worker import Worker
 
 HEIGHT = 16
 WIDTH = 16
 MINES = 32
+FPS = 30
 
 # Colors
 BLACK = (0, 0, 0)
@@ -49,11 +56,32 @@ lost = False
 # Show instructions initially
 instructions = True
 
+# all calls on the AI run here, one at a time, so inference never
+# holds up drawing; the loop only touches `ai` while the worker is idle
+worker = Worker()
+clock = pygame.time.Clock()
+
+
+def ai_move(ai):
+    """
+    The AI's next move, a known safe cell or else a random one, and
+    what it decided.
+    """
+    move = ai.make_safe_move()
+    if move is not None:
+        return move, "AI making safe move."
+    move = ai.make_random_move()
+    if move is None:
+        return None, "No moves left to make."
+    return move, "No known safe moves, AI making random move."
+
+
 while True:
 
     # Check if game quit
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            worker.shutdown()
             sys.exit()
 
     screen.fill(BLACK)
@@ -96,6 +124,7 @@ while True:
                 time.sleep(0.3)
 
         pygame.display.flip()
+        clock.tick(FPS)
         continue
 
     # Draw board
@@ -159,8 +188,27 @@ while True:
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
     screen.blit(text, textRect)
 
+    # Show how long the AI has been working
+    if worker.thinking():
+        text = smallFont.render(
+            f"Thinking... {worker.elapsed():.1f}s", True, WHITE
+        )
+        textRect = text.get_rect()
+        textRect.center = ((5 / 6) * width, (2 / 3) * height + 40)
+        screen.blit(text, textRect)
+
     move = None
 
+    # Pick up the AI's move once it has been decided; add_knowledge
+    # calls queued behind it return None
+    if worker.done():
+        decided = worker.result()
+        if decided is not None and not lost:
+            move, message = decided
+            print(message)
+            if move is None:
+                flags = ai.mines.copy()
+
     left, _, right = pygame.mouse.get_pressed()
 
     # Check for a right-click to toggle flagging
@@ -178,32 +226,27 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
-        if aiButton.collidepoint(mouse) and not lost: 
-        # if not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+        # If AI button clicked, make an AI move, once the AI has caught
+        # up with the last one; a move picked up this frame has not been
+        # handed to add_knowledge yet
+        if aiButton.collidepoint(mouse) and not lost:
+            if move is None and not worker.thinking():
+                worker.submit(ai_move, ai)
             time.sleep(0.2)
 
         # Reset game state
         elif resetButton.collidepoint(mouse):
+            worker.cancel()
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
             ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()
             flags = set()
             lost = False
+            clock.tick(FPS)
             continue
 
-        # User-made move
-        elif not lost:
+        # User-made move, once the AI has caught up with the last one
+        elif not lost and move is None and not worker.thinking():
             for i in range(HEIGHT):
                 for j in range(WIDTH):
                     if (cells[i][j].collidepoint(mouse)
@@ -218,6 +261,7 @@ while True:
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            worker.submit(ai.add_knowledge, move, nearby)
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -22,9 +22,9 @@ symbols = characters + rooms + weapons
 
 def check_knowledge(knowledge):
     for symbol in symbols:
-        if model_check(knowledge, symbol):
+        if sat_check(knowledge, symbol):
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif not sat_check(knowledge, Not(symbol)):
             print(f"{symbol}: MAYBE")
 
 
@@ -1,5 +1,10 @@
 import itertools
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class Sentence():
 
@@ -15,6 +20,20 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def tseitin(self, cnf):
+        """
+        Adds clauses to `cnf` defining a literal equivalent to the
+        sentence, and returns that literal.
+        """
+        raise Exception("nothing to encode")
+
+    def expression(self, program):
+        """
+        Returns Python source computing the sentence with bitwise
+        operations, adding any statements it needs to `program`.
+        """
+        raise Exception("nothing to compile")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +87,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
+    def expression(self, program):
+        return program.variable(self.name)
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +117,13 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def tseitin(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def expression(self, program):
+        operand = program.value(self.operand)
+        return program.emit(f"~{operand}", program.depth(operand) + 1)
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +161,13 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def tseitin(self, cnf):
+        return cnf.gate_and([cnf.literal(c) for c in self.conjuncts])
+
+    def expression(self, program):
+        return program.combine(
+            "&", [program.value(c) for c in self.conjuncts], "TRUE")
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +199,13 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def tseitin(self, cnf):
+        return -cnf.gate_and([-cnf.literal(d) for d in self.disjuncts])
+
+    def expression(self, program):
+        return program.combine(
+            "|", [program.value(d) for d in self.disjuncts], "FALSE")
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +237,16 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def tseitin(self, cnf):
+        return -cnf.gate_and([cnf.literal(self.antecedent),
+                              -cnf.literal(self.consequent)])
+
+    def expression(self, program):
+        antecedent = program.value(self.antecedent)
+        consequent = program.value(self.consequent)
+        depth = max(program.depth(antecedent), program.depth(consequent))
+        return program.emit(f"~{antecedent} | {consequent}", depth + 2)
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,6 +280,15 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def tseitin(self, cnf):
+        return cnf.gate_iff(cnf.literal(self.left), cnf.literal(self.right))
+
+    def expression(self, program):
+        left = program.value(self.left)
+        right = program.value(self.right)
+        depth = max(program.depth(left), program.depth(right))
+        return program.emit(f"~({left} ^ {right})", depth + 2)
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
@@ -261,3 +326,461 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class Program():
+    """
+    Python code for a sentence: statements assigning temporaries, then
+    an expression over them. Subexpressions are written inline, which
+    lets NumPy reuse its intermediate arrays, until they nest DEPTH
+    operations deep; then they are assigned to a temporary (t7 = ...),
+    so big or deeply nested sentences never turn into one expression
+    too large for Python to compile. Symbol `name` is v{index[name]}.
+    """
+
+    # deepest nesting of operations kept in one expression
+    DEPTH = 40
+    # most operands joined in one expression by `combine`
+    WIDTH = 32
+
+    def __init__(self, index):
+        self.index = index
+        self.lines = []
+        # sentence -> source, so repeated subsentences are written once
+        self.sources = dict()
+        # source -> operations nested in it, for sources that are not names
+        self.depths = dict()
+
+    def variable(self, name):
+        return f"v{self.index[name]}"
+
+    def value(self, sentence):
+        """Returns source for the value of `sentence`."""
+        if sentence not in self.sources:
+            self.sources[sentence] = sentence.expression(self)
+        return self.sources[sentence]
+
+    def depth(self, source):
+        return self.depths.get(source, 0)
+
+    def emit(self, expression, depth):
+        """Returns source for `expression`, which nests `depth` operations."""
+        if depth > self.DEPTH:
+            name = f"t{len(self.lines)}"
+            self.lines.append(f"{name} = {expression}")
+            return name
+        source = f"({expression})"
+        self.depths[source] = depth
+        return source
+
+    def combine(self, operator, sources, empty):
+        """Returns source for `sources` joined with `operator`."""
+        if not sources:
+            return empty
+        while len(sources) > 1:
+            groups = [sources[i:i + self.WIDTH]
+                      for i in range(0, len(sources), self.WIDTH)]
+            sources = [self.emit(f" {operator} ".join(group),
+                                 max(map(self.depth, group)) + len(group))
+                       for group in groups]
+        return sources[0]
+
+
+class Compiled():
+    """
+    A sentence compiled to generated Python functions over numbered
+    symbols, so it can be evaluated without walking the sentence tree.
+
+    A model is a bit-vector: an int whose bit i is the value of symbol
+    self.symbols[i]. Model number m of a model check is the int m, so
+    the models are just range(2 ** n). In block mode each symbol is
+    instead a NumPy array of 64-bit words holding its value in 64
+    models at a time, and one pass of bitwise operations over the arrays
+    evaluates the sentence in every one of those models.
+    """
+
+    # bit j of the word is set in models whose bit i is set, for i < 6
+    PATTERNS = [sum(1 << j for j in range(64) if j >> i & 1)
+                for i in range(6)]
+
+    def __init__(self, sentence, symbols=None):
+        Sentence.validate(sentence)
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.symbols = list(symbols)
+        program = Program({name: i for i, name in enumerate(self.symbols)})
+        result = program.value(sentence)
+        body = "".join(f"    {line}\n" for line in program.lines)
+        # every temporary holds an array in block mode, so size blocks
+        # to keep them all to a few tens of megabytes together
+        self.block_words = max(64, min(1 << 14,
+                                       (1 << 22) // max(1, len(program.lines))))
+        names = [f"v{i}" for i in range(len(self.symbols))]
+
+        # bit 0 of each shifted model is the symbol's value, and bitwise
+        # operations keep bits apart, so bit 0 of the result is the answer
+        source = "def bits(m):\n"
+        for i, name in enumerate(names):
+            source += f"    {name} = m >> {i}\n"
+        source += body + f"    return bool({result} & 1)\n"
+        namespace = {"TRUE": -1, "FALSE": 0}
+        exec(source, namespace)
+        self.bits = namespace["bits"]
+
+        self.block = None
+        if np is not None:
+            source = "def block(v):\n"
+            if names:
+                source += f"    {', '.join(names)}, = v\n"
+            source += body + f"    return {result}\n"
+            namespace = {"TRUE": np.uint64(2 ** 64 - 1),
+                         "FALSE": np.uint64(0)}
+            exec(source, namespace)
+            self.block = namespace["block"]
+
+    def encode(self, model):
+        """The bit-vector of a model given as symbol name -> bool."""
+        return sum(1 << i for i, name in enumerate(self.symbols)
+                   if model[name])
+
+    def evaluate(self, model):
+        return self.bits(self.encode(model))
+
+    def words(self, start, count):
+        """
+        Symbol arrays for `count` words of models, starting with models
+        64 * start to 64 * start + 63.
+        """
+        word = np.arange(start, start + count, dtype=np.uint64)
+        arrays = []
+        for i in range(len(self.symbols)):
+            if i < 6:
+                arrays.append(np.full(count, self.PATTERNS[i],
+                                      dtype=np.uint64))
+            else:
+                bit = (word >> np.uint64(i - 6)) & np.uint64(1)
+                # all ones where the bit is set
+                arrays.append(np.uint64(0) - bit)
+        return arrays
+
+    def models(self, block_words=None):
+        """
+        Yields (first model, words) for every block of models, where bit j
+        of words[k] is the value of the sentence in model
+        first + 64 * k + j. Needs NumPy.
+        """
+        if self.block is None:
+            raise Exception("block evaluation needs NumPy")
+        block_words = block_words or self.block_words
+        total = 2 ** len(self.symbols)
+        count = -(-total // 64)
+        # models past the last one, in a final partial word
+        spare = 64 * count - total
+        for start in range(0, count, block_words):
+            size = min(block_words, count - start)
+            words = np.asarray(self.block(self.words(start, size)),
+                               dtype=np.uint64)
+            words = np.broadcast_to(words, (size,)).copy()
+            if spare and start + size == count:
+                words[-1] &= np.uint64(2 ** (64 - spare) - 1)
+            yield 64 * start, words
+
+    def count(self):
+        """Number of models in which the sentence is true."""
+        if self.block is None:
+            return sum(self.bits(m) for m in range(2 ** len(self.symbols)))
+        total = 0
+        for _, words in self.models():
+            total += int(np.unpackbits(words.view(np.uint8)).sum())
+        return total
+
+
+def compiled_check(knowledge, query, vectorized=True):
+    """
+    Checks if knowledge base entails query, as model_check does, by
+    compiling "knowledge and not query" and scanning every model for one
+    where it is true: with NumPy, a block of models at a time, otherwise
+    one bit-vector model at a time.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counterexample = Compiled(And(knowledge, Not(query)), symbols)
+    if vectorized and counterexample.block is not None:
+        return not any(words.any() for _, words in counterexample.models())
+    return not any(counterexample.bits(m) for m in range(2 ** len(symbols)))
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from sentences with the
+    Tseitin encoding: every connective gets a fresh variable defined to be
+    equivalent to it, so the clauses grow linearly with the sentence.
+    Variables are numbered from 1, and literal -v is the negation of v.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.num_variables = 0
+        # symbol name -> variable
+        self.variables = dict()
+        # sentence -> literal, so shared subsentences are encoded once
+        self.literals = dict()
+
+    def variable(self, name):
+        if name not in self.variables:
+            self.num_variables += 1
+            self.variables[name] = self.num_variables
+        return self.variables[name]
+
+    def fresh(self):
+        self.num_variables += 1
+        return self.num_variables
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to `sentence`."""
+        Sentence.validate(sentence)
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.tseitin(self)
+        return self.literals[sentence]
+
+    def gate_and(self, literals):
+        """Returns a fresh literal equivalent to the conjunction."""
+        gate = self.fresh()
+        for literal in literals:
+            self.clauses.append([-gate, literal])
+        self.clauses.append([gate] + [-literal for literal in literals])
+        return gate
+
+    def gate_iff(self, left, right):
+        """Returns a fresh literal equivalent to left <=> right."""
+        gate = self.fresh()
+        self.clauses.append([-gate, -left, right])
+        self.clauses.append([-gate, left, -right])
+        self.clauses.append([gate, left, right])
+        self.clauses.append([gate, -left, -right])
+        return gate
+
+    def add(self, sentence):
+        """Asserts that `sentence` is true."""
+        if isinstance(sentence, And):
+            # conjuncts of the top-level And need no gate of their own
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """
+    CDCL SAT solver: unit propagation over two watched literals per
+    clause, learning a first-UIP clause from every conflict, jumping back
+    to the level where it becomes unit, and branching on the variable
+    most involved in recent conflicts.
+    """
+
+    def __init__(self, num_variables, clauses):
+        self.num_variables = num_variables
+        # variable -> 1 (true), -1 (false) or 0 (unassigned)
+        self.value = [0] * (num_variables + 1)
+        self.level = [0] * (num_variables + 1)
+        # variable -> clause that implied its value, None for decisions
+        self.reason = [None] * (num_variables + 1)
+        self.activity = [0.0] * (num_variables + 1)
+        self.bump = 1.0
+        # last value of each variable, tried first when branching on it
+        self.phase = [-1] * (num_variables + 1)
+        # literal -> clauses watching it, at index 2 * var + (literal < 0)
+        self.watches = [[] for _ in range(2 * num_variables + 2)]
+        self.trail = []
+        # where each decision level starts on the trail
+        self.levels = []
+        self.head = 0
+        self.ok = True
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def literal_value(self, literal):
+        value = self.value[abs(literal)]
+        return value if literal > 0 else -value
+
+    def watch(self, literal, clause):
+        self.watches[2 * abs(literal) + (literal < 0)].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.value[variable] = 1 if literal > 0 else -1
+        self.level[variable] = len(self.levels)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def add_clause(self, literals):
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return
+            if literal not in clause:
+                clause.append(literal)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            value = self.literal_value(clause[0])
+            if value == -1:
+                self.ok = False
+            elif value == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause[0], clause)
+            self.watch(clause[1], clause)
+
+    def propagate(self):
+        """Assigns implied literals; returns a falsified clause, or None."""
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[2 * abs(false) + (false < 0)]
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                # keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if self.literal_value(clause[0]) == 1:
+                    i += 1
+                    continue
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], false
+                        self.watch(clause[1], clause)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if self.literal_value(clause[0]) == -1:
+                        return clause
+                    self.assign(clause[0], clause)
+                    i += 1
+        return None
+
+    def analyze(self, conflict):
+        """Returns the learnt clause and the level to jump back to."""
+        current = len(self.levels)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.activity[variable] += self.bump
+                if self.level[variable] == current:
+                    pending += 1
+                else:
+                    learnt.append(other)
+            # the most recent literal of this level involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(literal)]
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = -literal
+        self.bump *= 1.05
+        if self.bump > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+
+        level = 0
+        if len(learnt) > 1:
+            # watch the literal assigned last, at the level jumped to
+            best = max(range(1, len(learnt)),
+                       key=lambda i: self.level[abs(learnt[i])])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            level = self.level[abs(learnt[1])]
+        return learnt, level
+
+    def backtrack(self, level):
+        if len(self.levels) <= level:
+            return
+        start = self.levels[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.value[variable]
+            self.value[variable] = 0
+            self.reason[variable] = None
+        del self.trail[start:]
+        del self.levels[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns an unassigned literal to try next, or None if done."""
+        best = None
+        for variable in range(1, self.num_variables + 1):
+            if self.value[variable] == 0 and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        if best is None:
+            return None
+        return best if self.phase[best] == 1 else -best
+
+    def solve(self):
+        """Returns True if the clauses are satisfiable, False otherwise."""
+        if not self.ok:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.levels:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watch(learnt[0], learnt)
+                    self.watch(learnt[1], learnt)
+                    self.assign(learnt[0], learnt)
+            else:
+                literal = self.decide()
+                if literal is None:
+                    return True
+                self.levels.append(len(self.trail))
+                self.assign(literal, None)
+
+    def model(self, variables):
+        """Maps each symbol name in `variables` to its value."""
+        return {name: self.value[variable] == 1
+                for name, variable in variables.items()}
+
+
+def satisfiable(sentence):
+    """
+    Returns a model (symbol name -> bool) in which `sentence` is true,
+    or None if there is none.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf.num_variables, cnf.clauses)
+    if not solver.solve():
+        return None
+    return solver.model(cnf.variables)
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, as model_check does, by
+    showing that knowledge and not query cannot both be true.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf.num_variables, cnf.clauses).solve()
@@ -0,0 +1,46 @@
+import random
+
+from logic import (And, Compiled, Not, Or, Symbol, compiled_check,
+                   model_check, sat_check)
+
+
+def large_knowledge(clauses=3000, symbols=20, seed=0):
+    rng = random.Random(seed)
+    names = [Symbol(f"s{i}") for i in range(symbols)]
+    knowledge = And()
+    for _ in range(clauses):
+        a, b = rng.sample(names, 2)
+        knowledge.add(Or(a if rng.random() < 0.5 else Not(a),
+                         b if rng.random() < 0.5 else Not(b)))
+    return knowledge, names
+
+
+def test_compiled_check_large_flat_knowledge():
+    knowledge, names = large_knowledge()
+    for query in names[:3]:
+        assert compiled_check(knowledge, query) == sat_check(knowledge, query)
+
+    compiled = Compiled(knowledge)
+    rng = random.Random(0)
+    for _ in range(200):
+        model = {name: rng.random() < 0.5 for name in compiled.symbols}
+        assert compiled.evaluate(model) == knowledge.evaluate(model)
+
+
+def test_compiled_check_matches_model_check_on_wide_knowledge():
+    knowledge, names = large_knowledge(clauses=400, symbols=12, seed=1)
+    # make it satisfiable so the answers are not all vacuously True
+    knowledge = Or(knowledge, And(*names))
+    for query in names[:4]:
+        assert compiled_check(knowledge, query) == model_check(knowledge, query)
+
+
+def test_compiled_deep_not_chain():
+    a = Symbol("a")
+    sentence = a
+    for _ in range(300):
+        sentence = Not(sentence)
+    compiled = Compiled(sentence)
+    assert compiled.evaluate({"a": True}) is True
+    assert compiled.evaluate({"a": False}) is False
+    assert compiled_check(a, sentence) == model_check(a, sentence)
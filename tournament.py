@@ -0,0 +1,227 @@
+"""
+Headless tournaments for the game-playing agents.
+
+Each agent plays a number of games against a random opponent, spread
+over a pool of processes:
+
+    tictactoe   tictactoe.minimax, playing X and O in turn
+    minesweeper MinesweeperAI on its own, won by revealing every safe cell
+    nim         a NimAI trained by self-play, moving first and second in turn
+
+Game n of a run is seeded from (--seed, n) alone, so the same options
+always give the same games however they are split between processes.
+For every agent the games per second, W/D/L rates, the work done per
+move (boards searched by minimax, sentences in the minesweeper knowledge
+base, actions scored by nim) and percentiles of the time the agent took
+per move are printed and, with --output, written as JSON.
+
+    python tournament.py --games 2000 --processes 4 --output games.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "L4_learning", "nim"))
+sys.path.insert(0, os.path.join(HERE, "L1_knowledge", "minesweeper"))
+sys.path.insert(0, os.path.join(HERE, "L0_search", "tictactoe"))
+
+import tictactoe as ttt
+from minesweeper import Minesweeper, MinesweeperAI
+from nim import Nim, train
+
+AGENTS = ("tictactoe", "minesweeper", "nim")
+PERCENTILES = (50, 90, 99)
+
+# the trained NimAI, handed to each worker process once
+_nim_ai = None
+
+
+def game_seed(seed, game):
+    return seed * 1_000_003 + game
+
+
+def play_tictactoe(game, rng):
+    """Minimax against random moves, as X in even games and O in odd ones."""
+    agent = ttt.X if game % 2 == 0 else ttt.O
+    board = ttt.initial_state()
+    nodes, latencies = [], []
+    while not ttt.terminal(board):
+        if ttt.player(board) == agent:
+            stats = {}
+            start = time.perf_counter()
+            move = ttt.minimax(board, stats)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(stats["nodes"])
+        else:
+            move = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, move)
+    winner = ttt.winner(board)
+    outcome = "draw" if winner is None else "win" if winner == agent else "loss"
+    return outcome, nodes, latencies
+
+
+def play_minesweeper(game, rng, height=8, width=8, mines=8):
+    """MinesweeperAI clearing a board, losing as soon as it hits a mine."""
+    # the game and the AI draw from the module-level generator
+    random.seed(rng.random())
+    board = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    safe_cells = height * width - mines
+    revealed = 0
+    nodes, latencies = [], []
+    while revealed < safe_cells:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None or board.is_mine(move):
+            latencies.append(time.perf_counter() - start)
+            nodes.append(len(ai.knowledge))
+            return "loss", nodes, latencies
+        ai.add_knowledge(move, board.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+        nodes.append(len(ai.knowledge))
+        revealed += 1
+    return "win", nodes, latencies
+
+
+def play_nim(game, rng):
+    """The trained NimAI against random moves, first in even games."""
+    agent = game % 2
+    nim = Nim()
+    nodes, latencies = [], []
+    while nim.winner is None:
+        if nim.player == agent:
+            start = time.perf_counter()
+            move = _nim_ai.choose_action(nim.piles, epsilon=False)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(len(Nim.available_actions(nim.piles)))
+        else:
+            move = rng.choice(sorted(Nim.available_actions(nim.piles)))
+        nim.move(move)
+    return ("win" if nim.winner == agent else "loss"), nodes, latencies
+
+
+GAMES = {
+    "tictactoe": play_tictactoe,
+    "minesweeper": play_minesweeper,
+    "nim": play_nim,
+}
+
+
+def init_worker(nim_ai):
+    global _nim_ai
+    _nim_ai = nim_ai
+
+
+def play_games(task):
+    """Plays games first..last - 1 of one agent; one record per game."""
+    agent, first, last, seed = task
+    play = GAMES[agent]
+    records = []
+    for game in range(first, last):
+        rng = random.Random(game_seed(seed, game))
+        outcome, nodes, latencies = play(game, rng)
+        records.append({"game": game, "outcome": outcome,
+                        "nodes": nodes, "latencies": latencies})
+    return records
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return None
+    rank = max(1, -(-p * len(values) // 100))
+    return values[rank - 1]
+
+
+def summary(agent, records, seconds):
+    games = len(records)
+    outcomes = [record["outcome"] for record in records]
+    nodes = [n for record in records for n in record["nodes"]]
+    latencies = sorted(t for record in records for t in record["latencies"])
+    result = {
+        "agent": agent,
+        "games": games,
+        "seconds": seconds,
+        "games_per_second": games / seconds if seconds else None,
+        "moves": len(latencies),
+        "nodes_per_move": sum(nodes) / len(nodes) if nodes else None,
+    }
+    for outcome in ("win", "draw", "loss"):
+        result[f"{outcome}_rate"] = outcomes.count(outcome) / games
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        result[f"p{p}_ms"] = None if value is None else value * 1e3
+    result["max_ms"] = latencies[-1] * 1e3 if latencies else None
+    return result
+
+
+def run(agent, games, seed, pool, chunk):
+    tasks = [(agent, first, min(first + chunk, games), seed)
+             for first in range(0, games, chunk)]
+    start = time.perf_counter()
+    records = [record for records in pool.map(play_games, tasks)
+               for record in records]
+    return summary(agent, records, time.perf_counter() - start)
+
+
+def report(results):
+    print(f"{'agent':<12} {'games':>6} {'games/s':>9} {'win':>6} {'draw':>6} "
+          f"{'loss':>6} {'nodes/move':>11} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8}")
+    for r in results:
+        print(f"{r['agent']:<12} {r['games']:>6} {r['games_per_second']:>9.1f} "
+              f"{r['win_rate']:>6.1%} {r['draw_rate']:>6.1%} "
+              f"{r['loss_rate']:>6.1%} {r['nodes_per_move']:>11.1f} "
+              f"{r['p50_ms']:>8.3f} {r['p90_ms']:>8.3f} {r['p99_ms']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="tournament.py")
+    parser.add_argument("agents", nargs="*", metavar="agent",
+                        help=f"any of {', '.join(AGENTS)} (default: all)")
+    parser.add_argument("--games", type=int, default=200,
+                        help="games per agent")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=25,
+                        help="games handed to a process at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nim-training", type=int, default=10000,
+                        help="self-play games to train the NimAI on")
+    parser.add_argument("--output", help="write the results to a .json file")
+    args = parser.parse_args()
+    agents = args.agents or AGENTS
+    for agent in agents:
+        if agent not in AGENTS:
+            parser.error(f"unknown agent: {agent}")
+
+    nim_ai = None
+    if "nim" in agents:
+        # train() reports every game it plays
+        random.seed(args.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            nim_ai = train(args.nim_training)
+
+    with multiprocessing.Pool(args.processes, init_worker,
+                              (nim_ai,)) as pool:
+        results = [run(agent, args.games, args.seed, pool, args.chunk)
+                   for agent in agents]
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"seed": args.seed, "processes": args.processes,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()